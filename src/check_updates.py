@@ -13,13 +13,30 @@ sys.path.insert(0, src_dir)
 
 from pathlib import Path
 import logging
+import logging.handlers
 
 # Setup logging
+log_file = Path.home() / ".cache" / "uum" / "check.log"
+log_file.parent.mkdir(parents=True, exist_ok=True)
+
+# delay=True opens the file on first emit, and the MemoryHandler batches
+# INFO lines into one flush (errors flush immediately) - a timer fire
+# costs a couple of syscalls instead of one per log line
+_file_handler = logging.FileHandler(log_file, delay=True)
+_file_handler.setFormatter(
+    logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+)
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
     handlers=[
-        logging.FileHandler(Path.home() / ".cache" / "uum" / "check.log"),
+        logging.handlers.MemoryHandler(
+            capacity=64,
+            flushLevel=logging.ERROR,
+            target=_file_handler,
+            flushOnClose=True,
+        ),
         logging.StreamHandler(),
     ]
 )
@@ -36,9 +53,10 @@ def main():
         config_path = Path(__file__).parent.parent / "config" / "sources.json"
         engine = UpdateEngine(config_path)
         
-        # Check for updates
+        # Check for updates - the notification only previews the first few
+        # names, so stop checking once enough updates are found
         logger.info("Checking for updates...")
-        updates = engine.get_updates_available()
+        updates = engine.get_updates_available(limit=5)
         
         if updates:
             logger.info(f"Found {len(updates)} updates available")
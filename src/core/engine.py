@@ -3,6 +3,7 @@ Universal Update Manager - Core Update Engine
 Coordinates update checking and installation across all plugins.
 """
 
+import copy
 import logging
 import threading
 from concurrent.futures import ThreadPoolExecutor, as_completed
@@ -23,6 +24,11 @@ from plugins import (
 
 logger = logging.getLogger(__name__)
 
+# Parsed config cache keyed by path, validated by (st_mtime_ns, st_size).
+# Engines are often re-constructed within a process (UI refresh, timer
+# fires); this skips the redundant reparse when the file hasn't changed.
+_CONFIG_CACHE: dict[Path, tuple[int, int, dict]] = {}
+
 
 class UpdateEngine:
     """
@@ -38,16 +44,30 @@ class UpdateEngine:
         """
         self.config_path = config_path
         self.plugins: list[UpdateSourcePlugin] = []
-        self._check_lock = threading.Lock()  # Guard parallel cache population
+        # Per-plugin semaphores guarding parallel cache population
+        self._check_sems: dict[UpdateSourcePlugin, threading.Semaphore] = {}
+        self._plugin_by_source: dict[str, UpdateSourcePlugin] = {}
         self.config = self._load_config(config_path)
+        self._history = None  # Lazily created, reused across installs
         self._init_plugins()
 
     def _load_config(self, config_path: Optional[Path]) -> dict:
         """Load configuration from file or use defaults."""
         if config_path and config_path.exists():
             try:
-                with open(config_path) as f:
-                    return json.load(f)
+                stat = config_path.stat()
+                cached = _CONFIG_CACHE.get(config_path)
+                if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+                    # Deep copy so each engine can mutate its config freely
+                    return copy.deepcopy(cached[2])
+
+                # Parse from a single bytes read - avoids the slower
+                # stream-decoding path of json.load(open(...))
+                config = json.loads(config_path.read_bytes())
+                _CONFIG_CACHE[config_path] = (
+                    stat.st_mtime_ns, stat.st_size, copy.deepcopy(config)
+                )
+                return config
             except (json.JSONDecodeError, IOError) as e:
                 logger.warning(f"Failed to load config: {e}")
         
@@ -57,8 +77,18 @@ class UpdateEngine:
         """Save current configuration to file."""
         if self.config_path:
             self.config_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.config_path, 'w') as f:
-                json.dump(self.config, f, indent=2)
+            # Serialize to one string and write in a single call instead of
+            # the many small writes json.dump(fp) produces
+            self.config_path.write_text(json.dumps(self.config, indent=2))
+
+            # Keep the parse cache warm for the file we just wrote
+            try:
+                stat = self.config_path.stat()
+                _CONFIG_CACHE[self.config_path] = (
+                    stat.st_mtime_ns, stat.st_size, copy.deepcopy(self.config)
+                )
+            except OSError:
+                pass
 
     def _default_config(self) -> dict:
         """Return default configuration."""
@@ -146,9 +176,29 @@ class UpdateEngine:
             self.plugins.append(
                 JetBrainsPlugin(self.config.get("jetbrains", {}))
             )
-    
-    def add_package(self, source_type: str, package_config: dict) -> None:
-        """Add a new package to configuration with deduplication."""
+
+        # One semaphore per plugin: serializes plugins whose checks fill a
+        # shared cache, while letting plugins with independent per-package
+        # checks run a few in flight (see max_concurrent_checks).
+        self._check_sems = {
+            plugin: threading.Semaphore(plugin.max_concurrent_checks)
+            for plugin in self.plugins
+        }
+
+        # Direct lookup for the hot _check_single path
+        self._plugin_by_source = {p.source_type: p for p in self.plugins}
+
+    def add_package(self, source_type: str, package_config: dict,
+                    defer_reinit: bool = False) -> None:
+        """
+        Add a new package to configuration with deduplication.
+
+        Args:
+            source_type: Source key in the config (e.g. "github", "web").
+            package_config: Package entry to add or merge.
+            defer_reinit: Skip saving and plugin reinit; callers doing bulk
+                imports should pass True and call commit() once at the end.
+        """
         if source_type not in self.config:
             self.config[source_type] = {"enabled": True, "packages": []}
         
@@ -156,31 +206,31 @@ class UpdateEngine:
             self.config[source_type]["packages"] = []
         
         packages = self.config[source_type]["packages"]
-        
-        # Check for duplicate by repo (for github) or id
+
+        # Check for duplicate by repo (for github) or id - O(1) dict lookups
+        # instead of scanning the package list per field
         new_repo = package_config.get("repo", "").lower()
         new_id = package_config.get("id", "").lower()
-        
-        for existing in packages:
-            existing_repo = existing.get("repo", "").lower()
-            existing_id = existing.get("id", "").lower()
-            
-            if new_repo and existing_repo == new_repo:
-                logger.warning(f"Duplicate repo {new_repo} - updating existing entry")
-                # Update existing entry instead of adding duplicate
-                existing.update(package_config)
-                self.save_config()
-                self.plugins = []
-                self._init_plugins()
-                return
-            
-            if existing_id == new_id:
-                logger.warning(f"Duplicate ID {new_id} - updating existing entry")
-                existing.update(package_config)
-                self.save_config()
-                self.plugins = []
-                self._init_plugins()
-                return
+
+        by_repo = {p["repo"].lower(): p for p in packages if p.get("repo")}
+        by_id = {p.get("id", "").lower(): p for p in packages}
+
+        existing = by_repo.get(new_repo) if new_repo else None
+        if existing is not None:
+            logger.warning(f"Duplicate repo {new_repo} - updating existing entry")
+            # Update existing entry instead of adding duplicate
+            existing.update(package_config)
+            if not defer_reinit:
+                self.commit()
+            return
+
+        existing = by_id.get(new_id)
+        if existing is not None:
+            logger.warning(f"Duplicate ID {new_id} - updating existing entry")
+            existing.update(package_config)
+            if not defer_reinit:
+                self.commit()
+            return
         
         # Sanitize ID if it looks auto-generated or ugly
         pkg_id = package_config.get("id", "")
@@ -192,12 +242,19 @@ class UpdateEngine:
                 package_config["id"] = package_config["name"].lower().replace(" ", "-")
         
         packages.append(package_config)
+        if not defer_reinit:
+            self.commit()
+
+    def commit(self) -> None:
+        """Persist config changes and rebuild plugins once.
+
+        Pairs with add_package(defer_reinit=True) so bulk imports pay the
+        save + plugin construction cost a single time.
+        """
         self.save_config()
-        
-        # Reinitialize plugins
         self.plugins = []
         self._init_plugins()
-    
+
     def ignore_package(self, package_id: str) -> None:
         """Add a package to the ignore list."""
         if "ignored" not in self.config:
@@ -214,52 +271,87 @@ class UpdateEngine:
         Returns:
             List of SoftwareInfo from all enabled plugins.
         """
-        all_software = []
-        for plugin in self.plugins:
+        def fetch(plugin: UpdateSourcePlugin) -> list[SoftwareInfo]:
             try:
-                software = plugin.get_tracked_software()
-                all_software.extend(software)
+                return plugin.get_tracked_software()
             except Exception as e:
                 logger.error(f"Error getting software from {plugin.name}: {e}")
+                return []
+
+        if not self.plugins:
+            return []
+
+        # Each plugin is I/O-bound (subprocess or network) and independent,
+        # so query them in parallel. map() preserves plugin order.
+        all_software = []
+        with ThreadPoolExecutor(max_workers=len(self.plugins)) as executor:
+            for software in executor.map(fetch, self.plugins):
+                all_software.extend(software)
         return all_software
 
-    def check_all_updates(self, parallel: bool = True) -> list[SoftwareInfo]:
+    def check_all_updates(self, parallel: bool = True,
+                          limit: Optional[int] = None) -> list[SoftwareInfo]:
         """
         Check for updates across all tracked software.
-        
+
         Args:
             parallel: Whether to check in parallel for speed.
-            
+            limit: If set, stop checking once this many updates were found.
+                Useful for callers that only need a hint (e.g. notification
+                previews); the returned list may then be incomplete.
+
         Returns:
             List of SoftwareInfo with updated status.
         """
         all_software = self.get_all_tracked_software()
-        
+
         if not parallel:
-            return [self._check_single(s) for s in all_software]
-        
+            results = []
+            found = 0
+            for s in all_software:
+                result = self._check_single(s)
+                results.append(result)
+                if result.status == UpdateStatus.UPDATE_AVAILABLE:
+                    found += 1
+                    if limit is not None and found >= limit:
+                        break
+            return results
+
+        # I/O-bound fan-out: size the pool to the workload, not a fixed 4
+        workers = min(32, max(4, len(all_software)))
         results = []
-        with ThreadPoolExecutor(max_workers=4) as executor:
+        found = 0
+        with ThreadPoolExecutor(max_workers=workers) as executor:
             futures = {
-                executor.submit(self._check_single, s): s 
+                executor.submit(self._check_single, s): s
                 for s in all_software
             }
             for future in as_completed(futures):
                 try:
-                    results.append(future.result())
+                    result = future.result()
                 except Exception as e:
-                    software = futures[future]
-                    software.status = UpdateStatus.ERROR
-                    software.error_message = str(e)
-                    results.append(software)
-        
+                    result = futures[future]
+                    result.status = UpdateStatus.ERROR
+                    result.error_message = str(e)
+                results.append(result)
+
+                if result.status == UpdateStatus.UPDATE_AVAILABLE:
+                    found += 1
+                    if limit is not None and found >= limit:
+                        # Enough for the caller - drop the remaining checks
+                        executor.shutdown(wait=False, cancel_futures=True)
+                        break
+
         return results
 
     def _check_single(self, software: SoftwareInfo) -> SoftwareInfo:
         """Check updates for a single software item (thread-safe)."""
         plugin = self._get_plugin_for_software(software)
         if plugin:
-            with self._check_lock:
+            sem = self._check_sems.setdefault(
+                plugin, threading.Semaphore(plugin.max_concurrent_checks)
+            )
+            with sem:
                 return plugin.check_for_updates(software)
         software.status = UpdateStatus.ERROR
         software.error_message = "No plugin found"
@@ -267,19 +359,20 @@ class UpdateEngine:
 
     def _get_plugin_for_software(self, software: SoftwareInfo) -> Optional[UpdateSourcePlugin]:
         """Get the plugin that handles a given software item."""
-        for plugin in self.plugins:
-            if plugin.source_type == software.source_type:
-                return plugin
-        return None
+        return self._plugin_by_source.get(software.source_type)
 
-    def get_updates_available(self) -> list[SoftwareInfo]:
+    def get_updates_available(self, limit: Optional[int] = None) -> list[SoftwareInfo]:
         """
         Get list of software with available updates.
-        
+
+        Args:
+            limit: If set, stop checking after this many updates were found
+                (the result is then a lower bound, not the full set).
+
         Returns:
             List of SoftwareInfo where status is UPDATE_AVAILABLE.
         """
-        all_software = self.check_all_updates()
+        all_software = self.check_all_updates(limit=limit)
         return [s for s in all_software if s.status == UpdateStatus.UPDATE_AVAILABLE]
 
     def install_update(self, software: SoftwareInfo) -> InstallResult:
@@ -301,11 +394,13 @@ class UpdateEngine:
         
         result = plugin.update(software)
         
-        # Record in history
+        # Record in history (one UpdateHistory per engine - constructing it
+        # reloads the whole history file, so don't do that per install)
         try:
-            from core.notifications import UpdateHistory
-            history = UpdateHistory()
-            history.add_record(
+            if self._history is None:
+                from core.notifications import UpdateHistory
+                self._history = UpdateHistory()
+            self._history.add_record(
                 software_id=software.id,
                 software_name=software.name,
                 source_type=software.source_type,
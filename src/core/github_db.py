@@ -3,25 +3,62 @@ Universal Update Manager - GitHub App Database
 Maps known applications to their GitHub repositories for auto-detection.
 """
 
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import Optional, Sequence
+import heapq
 import re
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class GitHubAppInfo:
-    """Information about a known GitHub-hosted application."""
+    """Information about a known GitHub-hosted application.
+
+    Slotted and frozen: instances live for the whole process and are never
+    mutated, so skipping the per-instance __dict__ shrinks the database's
+    footprint and speeds up attribute access in the matcher.
+    """
     name: str
     repo: str
     asset_pattern: str
-    desktop_patterns: list[str]  # Patterns to match .desktop file names
-    executable_patterns: list[str]  # Patterns to match executable names
+    desktop_patterns: tuple[str, ...]  # Patterns to match .desktop file names
+    executable_patterns: tuple[str, ...]  # Patterns to match executable names
     install_type: str = "deb"  # deb, appimage, tarball
 
+    # Derived in __post_init__, excluded from repr/eq
+    _asset_regex: "re.Pattern[str]" = field(init=False, repr=False, compare=False)
+    _desktop_patterns_lower: tuple[str, ...] = field(init=False, repr=False, compare=False)
+    _executable_patterns_lower: tuple[str, ...] = field(init=False, repr=False, compare=False)
+    _name_lower: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        # Frozen dataclass: derived attributes go through object.__setattr__
+        _set = object.__setattr__
+
+        # Accept lists in the literals below but store tuples
+        _set(self, "desktop_patterns", tuple(self.desktop_patterns))
+        _set(self, "executable_patterns", tuple(self.executable_patterns))
+
+        # Compile once at construction (i.e. module import for the builtin
+        # database) instead of recompiling on every asset match
+        _set(self, "_asset_regex", re.compile(self.asset_pattern, re.IGNORECASE))
+
+        # Pre-lowered match data so find_matching_github_app compares
+        # without allocating new strings per lookup
+        _set(self, "_desktop_patterns_lower",
+             tuple(p.lower() for p in self.desktop_patterns))
+        _set(self, "_executable_patterns_lower",
+             tuple(p.lower() for p in self.executable_patterns))
+        _set(self, "_name_lower", self.name.lower())
+
+    def match_asset(self, asset_name: str) -> bool:
+        """Check whether a release asset name matches this app's pattern."""
+        return self._asset_regex.match(asset_name) is not None
+
 
 # Database of known GitHub applications
 # This allows auto-detection of apps without manual onboarding
-GITHUB_APP_DATABASE: list[GitHubAppInfo] = [
+# (a tuple: the database is read-only after import)
+GITHUB_APP_DATABASE: tuple[GitHubAppInfo, ...] = (
     # Communication
     GitHubAppInfo(
         name="Telegram Desktop",
@@ -227,80 +264,168 @@ GITHUB_APP_DATABASE: list[GitHubAppInfo] = [
         executable_patterns=["protonup"],
         install_type="appimage",
     ),
-]
+)
+
+
+# O(1) repo lookups for get_app_by_repo
+_REPO_INDEX: dict[str, GitHubAppInfo] = {
+    app.repo.lower(): app for app in GITHUB_APP_DATABASE
+}
+
+
+def _build_match_indexes() -> tuple[
+    dict[str, list[int]], dict[str, list[int]], dict[str, list[int]]
+]:
+    """Build inverted pattern -> app-index maps for candidate narrowing."""
+    desktop_index: dict[str, list[int]] = {}
+    executable_index: dict[str, list[int]] = {}
+    name_index: dict[str, list[int]] = {}
+
+    for i, app in enumerate(GITHUB_APP_DATABASE):
+        for pattern in app._desktop_patterns_lower:
+            desktop_index.setdefault(pattern, []).append(i)
+        for pattern in app._executable_patterns_lower:
+            executable_index.setdefault(pattern, []).append(i)
+        name_index.setdefault(app._name_lower, []).append(i)
+
+    return desktop_index, executable_index, name_index
+
+
+# Inverted indexes so a lookup scans unique patterns once to pick the few
+# candidate apps, instead of running the nested scoring loops over every
+# app in the database
+_DESKTOP_INDEX, _EXECUTABLE_INDEX, _NAME_INDEX = _build_match_indexes()
+
+# Match kinds for the fused pattern table below
+_KIND_DESKTOP = 0
+_KIND_EXECUTABLE = 1
+_KIND_NAME = 2
+
+# All patterns from the three indexes flattened into one table, so a
+# lookup makes a single pass over every unique pattern instead of three
+# separate dict iterations
+_FUSED_PATTERNS: tuple[tuple[int, str, tuple[int, ...]], ...] = tuple(
+    (kind, pattern, tuple(idxs))
+    for kind, index in (
+        (_KIND_DESKTOP, _DESKTOP_INDEX),
+        (_KIND_EXECUTABLE, _EXECUTABLE_INDEX),
+        (_KIND_NAME, _NAME_INDEX),
+    )
+    for pattern, idxs in index.items()
+)
 
 
 def find_matching_github_app(
     desktop_file_name: Optional[str] = None,
     executable_name: Optional[str] = None,
     app_name: Optional[str] = None,
+    limit: Optional[int] = 5,
 ) -> list[GitHubAppInfo]:
     """
     Find GitHub apps that match the given criteria.
-    
+
     Args:
         desktop_file_name: Name of the .desktop file
         executable_name: Name of the executable
         app_name: Display name of the application
-        
+        limit: Max number of results to return (None for all matches)
+
     Returns:
         List of matching GitHubAppInfo objects (may be multiple for ambiguous matches)
     """
     matches = []
-    
-    for app in GITHUB_APP_DATABASE:
+
+    # Lowercase the query sides once; pattern sides are pre-lowered
+    desktop_lower = desktop_file_name.lower() if desktop_file_name else None
+    exe_lower = executable_name.lower() if executable_name else None
+    app_name_lower = app_name.lower() if app_name else None
+
+    # Fast path: an exact name hit scores higher than any other app can
+    # when no other criteria are in play, so skip the scan entirely. With
+    # desktop/executable criteria present the full scoring still runs,
+    # since those bonuses can reorder the results.
+    if app_name_lower and desktop_lower is None and exe_lower is None:
+        exact = _NAME_INDEX.get(app_name_lower)
+        if exact:
+            return [GITHUB_APP_DATABASE[exact[0]]]
+
+    # Narrow to candidate apps in one fused pass over the pattern table:
+    # every unique pattern is tested once against its query kind, and only
+    # apps that can score at all get rescored below
+    name_words = (
+        [w for w in app_name_lower.split() if len(w) > 3]
+        if app_name_lower else []
+    )
+    candidates: set[int] = set()
+    for kind, pattern, idxs in _FUSED_PATTERNS:
+        if kind == _KIND_DESKTOP:
+            hit = desktop_lower is not None and pattern in desktop_lower
+        elif kind == _KIND_EXECUTABLE:
+            hit = exe_lower is not None and (
+                pattern in exe_lower or exe_lower in pattern
+            )
+        else:
+            hit = app_name_lower is not None and (
+                app_name_lower in pattern or pattern in app_name_lower
+                or any(word in pattern for word in name_words)
+            )
+        if hit:
+            candidates.update(idxs)
+
+    # Score candidates in database order so equal scores keep a stable rank
+    for i in sorted(candidates):
+        app = GITHUB_APP_DATABASE[i]
         score = 0
-        
+
         # Check desktop file patterns
-        if desktop_file_name:
-            desktop_lower = desktop_file_name.lower()
-            for pattern in app.desktop_patterns:
-                if pattern.lower() in desktop_lower:
+        if desktop_lower:
+            for pattern in app._desktop_patterns_lower:
+                if pattern in desktop_lower:
                     score += 2
                     break
-        
+
         # Check executable patterns
-        if executable_name:
-            exe_lower = executable_name.lower()
-            for pattern in app.executable_patterns:
-                if pattern.lower() in exe_lower or exe_lower in pattern.lower():
+        if exe_lower:
+            for pattern in app._executable_patterns_lower:
+                if pattern in exe_lower or exe_lower in pattern:
                     score += 2
                     break
-        
+
         # Check app name (fuzzy match)
-        if app_name:
-            app_name_lower = app_name.lower()
-            db_name_lower = app.name.lower()
-            
+        if app_name_lower:
+            db_name_lower = app._name_lower
+
             # Exact match
             if app_name_lower == db_name_lower:
                 score += 5
             # Contains match
             elif app_name_lower in db_name_lower or db_name_lower in app_name_lower:
                 score += 3
-            # Word match
+            # Word match (name_words is tokenized and length-filtered once
+            # above, not per app)
             else:
-                for word in app_name_lower.split():
-                    if len(word) > 3 and word in db_name_lower:
+                for word in name_words:
+                    if word in db_name_lower:
                         score += 1
-        
+
         if score > 0:
             matches.append((score, app))
     
-    # Sort by score descending
-    matches.sort(key=lambda x: x[0], reverse=True)
-    return [app for score, app in matches]
+    # Callers only ever look at the first few results, so pick the top
+    # scores with a bounded heap instead of sorting everything. nlargest
+    # keeps the same stable tie order as a full reverse sort.
+    if limit is not None:
+        top = heapq.nlargest(limit, matches, key=lambda x: x[0])
+    else:
+        top = sorted(matches, key=lambda x: x[0], reverse=True)
+    return [app for score, app in top]
 
 
-def get_all_known_apps() -> list[GitHubAppInfo]:
-    """Get all apps in the database."""
-    return GITHUB_APP_DATABASE.copy()
+def get_all_known_apps() -> Sequence[GitHubAppInfo]:
+    """Get all apps in the database (read-only view, no copy)."""
+    return GITHUB_APP_DATABASE
 
 
 def get_app_by_repo(repo: str) -> Optional[GitHubAppInfo]:
     """Find an app by its GitHub repo."""
-    repo_lower = repo.lower()
-    for app in GITHUB_APP_DATABASE:
-        if app.repo.lower() == repo_lower:
-            return app
-    return None
+    return _REPO_INDEX.get(repo.lower())
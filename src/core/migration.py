@@ -3,17 +3,143 @@ Universal Update Manager - Flatpak to GitHub Migration
 Handles migration of Flatpak apps to native GitHub releases while preserving user data.
 """
 
+import os
+import re
+import sqlite3
 import subprocess
 import shutil
 import json
+import threading
+import time
 import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from dataclasses import dataclass
 from typing import Optional
 import logging
 
+from plugins.base import USER_AGENT
+
 logger = logging.getLogger(__name__)
 
+# Strips whitespace, a leading "v", and -suffix/~suffix in one match
+# instead of chained strip/lstrip/split allocations
+_VERSION_PREFIX_RE = re.compile(r"^\s*v?([^-~\s]*)")
+
+
+class _SqliteCache:
+    """Keyed TTL cache for GitHub release info, backed by sqlite.
+
+    Reads and writes touch single rows, so per-entry cost stays constant
+    no matter how large the cache grows — unlike the old JSON file, which
+    was parsed in full at startup and rewritten in full on every update.
+    """
+
+    def __init__(self, path: Path, ttl: float):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = None
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(path), check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache "
+                "(repo TEXT PRIMARY KEY, ts REAL, data TEXT, etag TEXT)"
+            )
+            try:
+                # Upgrade databases created before the etag column existed
+                self._conn.execute("ALTER TABLE cache ADD COLUMN etag TEXT")
+            except sqlite3.OperationalError:
+                pass
+            # Prune expired entries that can't be revalidated via etag,
+            # plus anything ancient, to bound growth
+            now = time.time()
+            self._conn.execute(
+                "DELETE FROM cache WHERE (? - ts >= ? AND etag IS NULL) "
+                "OR ? - ts >= ?",
+                (now, ttl, now, 30 * 86400),
+            )
+            self._conn.commit()
+        except Exception as e:
+            logger.debug(f"Failed to open cache database: {e}")
+            self._conn = None
+
+    def get(self, repo: str, allow_stale: bool = False) -> Optional[dict]:
+        """Return the cached data for a repo, or None if absent/expired."""
+        if self._conn is None:
+            return None
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT ts, data FROM cache WHERE repo = ?", (repo,)
+                ).fetchone()
+            if row is None:
+                return None
+            ts, data = row
+            if not allow_stale and time.time() - ts >= self.ttl:
+                return None
+            return json.loads(data)
+        except Exception as e:
+            logger.debug(f"Failed to read cache for {repo}: {e}")
+            return None
+
+    def put(self, repo: str, data: dict, etag: Optional[str] = None):
+        """Store or refresh the cached data (and etag) for a repo."""
+        if self._conn is None:
+            return
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO cache (repo, ts, data, etag) "
+                    "VALUES (?, ?, ?, ?)",
+                    (repo, time.time(), json.dumps(data), etag),
+                )
+                self._conn.commit()
+        except Exception as e:
+            logger.debug(f"Failed to write cache for {repo}: {e}")
+
+    def get_etag(self, repo: str) -> Optional[str]:
+        """Return the stored etag for a repo, fresh or not."""
+        if self._conn is None:
+            return None
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT etag FROM cache WHERE repo = ?", (repo,)
+                ).fetchone()
+            return row[0] if row else None
+        except Exception as e:
+            logger.debug(f"Failed to read etag for {repo}: {e}")
+            return None
+
+    def touch(self, repo: str):
+        """Mark an entry fresh again after the server confirmed it."""
+        if self._conn is None:
+            return
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "UPDATE cache SET ts = ? WHERE repo = ?",
+                    (time.time(), repo),
+                )
+                self._conn.commit()
+        except Exception as e:
+            logger.debug(f"Failed to touch cache for {repo}: {e}")
+
+    def is_fresh(self, repo: str) -> bool:
+        """Check whether a repo has a non-expired entry."""
+        if self._conn is None:
+            return False
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT ts FROM cache WHERE repo = ?", (repo,)
+                ).fetchone()
+            return row is not None and time.time() - row[0] < self.ttl
+        except Exception as e:
+            logger.debug(f"Failed to check cache for {repo}: {e}")
+            return False
+
 
 @dataclass
 class GitHubAlternative:
@@ -59,6 +185,9 @@ class FlatpakMigrator:
     
     # Cache TTL in seconds (1 hour)
     CACHE_TTL = 3600
+
+    # Max entries kept in the in-process hot cache
+    HOT_CACHE_MAX = 128
     
     # Fallback data for cold starts when rate limited
     FALLBACK_DATA = {
@@ -85,38 +214,12 @@ class FlatpakMigrator:
             "data": Path.home() / ".local/share",
             "cache": Path.home() / ".cache",
         }
-        self._cache: dict[str, tuple[float, dict]] = {}
-        self._cache_file = Path.home() / ".cache/uum_migration_cache.json"
-        self._load_cache()
-    
-    def _load_cache(self):
-        """Load cache from disk."""
-        if self._cache_file.exists():
-            try:
-                import time
-                with open(self._cache_file, "r") as f:
-                    cached = json.load(f)
-                    now = time.time()
-                    # Only keep non-expired entries
-                    self._cache = {
-                        k: (v["ts"], v["data"]) 
-                        for k, v in cached.items() 
-                        if now - v["ts"] < self.CACHE_TTL
-                    }
-            except Exception as e:
-                logger.debug(f"Failed to load cache: {e}")
-    
-    def _save_cache(self):
-        """Save cache to disk."""
-        try:
-            self._cache_file.parent.mkdir(parents=True, exist_ok=True)
-            with open(self._cache_file, "w") as f:
-                json.dump(
-                    {k: {"ts": v[0], "data": v[1]} for k, v in self._cache.items()},
-                    f
-                )
-        except Exception as e:
-            logger.debug(f"Failed to save cache: {e}")
+        self._cache = _SqliteCache(
+            Path.home() / ".cache/uum_migration_cache.sqlite", self.CACHE_TTL
+        )
+        # Hot in-process layer over the sqlite cache: repeated lookups for
+        # the same repo within one run skip the database round-trip
+        self._hot: dict[str, tuple[float, dict]] = {}
     
     def find_alternatives(self, flatpak_apps: list[dict]) -> list[GitHubAlternative]:
         """
@@ -129,25 +232,41 @@ class FlatpakMigrator:
             List of GitHubAlternative for apps that have newer GitHub versions
         """
         alternatives = []
-        
+
+        # Resolve repos first so the uncached ones can be fetched
+        # concurrently below
+        pending: list[tuple[dict, str]] = []
         for app in flatpak_apps:
             app_id = app.get("id", "")
-            
+
             # Check known mappings first
             github_repo = self.KNOWN_MAPPINGS.get(app_id)
-            
+
             # Skip if explicitly marked as None (no GitHub)
             if github_repo is None:
                 continue
-            
+
             if not github_repo:
                 # Try to guess repo from app ID
                 github_repo = self._guess_github_repo(app_id, app.get("name", ""))
-            
+
             if not github_repo:
                 continue
-            
-            # Fetch GitHub info (with cache)
+
+            pending.append((app, github_repo))
+
+        # Each fetch is a blocking HTTP round-trip with a 10s timeout, so N
+        # serial fetches cost the sum of the latencies; warming the cache
+        # from a thread pool costs roughly the slowest single fetch instead
+        uncached = {repo for _, repo in pending if not self._cache_is_fresh(repo)}
+        if len(uncached) > 1:
+            with ThreadPoolExecutor(max_workers=min(8, len(uncached))) as executor:
+                list(executor.map(self._fetch_github_info, uncached))
+
+        for app, github_repo in pending:
+            app_id = app.get("id", "")
+
+            # Fetch GitHub info (with cache, warmed above)
             gh_info = self._fetch_github_info(github_repo)
             if not gh_info:
                 continue
@@ -170,7 +289,7 @@ class FlatpakMigrator:
                     github_description=gh_info.get("description"),
                     is_newer=is_newer,
                 ))
-        
+
         return alternatives
     
     def _guess_github_repo(self, app_id: str, app_name: str) -> Optional[str]:
@@ -190,49 +309,86 @@ class FlatpakMigrator:
         
         return None
     
+    def _cache_is_fresh(self, repo: str) -> bool:
+        """Check whether a repo has a non-expired cache entry."""
+        return self._cache.is_fresh(repo)
+
+    def _remember_hot(self, repo: str, data: dict):
+        """Keep a result in the hot cache, evicting the oldest when full."""
+        if len(self._hot) >= self.HOT_CACHE_MAX:
+            self._hot.pop(next(iter(self._hot)), None)
+        self._hot[repo] = (time.time(), data)
+
     def _fetch_github_info(self, repo: str) -> Optional[dict]:
         """Fetch latest release info from GitHub (with caching)."""
-        import time
         import urllib.error
-        
-        # Check cache first
-        if repo in self._cache:
-            try:
-                ts, data = self._cache[repo]
-                # If cache is fresh (less than TTL), return it
-                if time.time() - ts < self.CACHE_TTL:
-                    logger.debug(f"Cache hit for {repo}")
-                    return data
-            except (ValueError, TypeError):
-                logger.warning(f"Invalid cache entry for {repo}")
+
+        # Hot cache first - a plain dict hit, no sqlite round-trip
+        hot = self._hot.get(repo)
+        if hot is not None and time.time() - hot[0] < self.CACHE_TTL:
+            return hot[1]
+
+        # Then the persistent cache
+        cached = self._cache.get(repo)
+        if cached is not None:
+            logger.debug(f"Cache hit for {repo}")
+            self._remember_hot(repo, cached)
+            return cached
         
         url = f"https://api.github.com/repos/{repo}/releases/latest"
         try:
-            req = urllib.request.Request(
-                url,
-                headers={"User-Agent": "UniversalUpdateManager/1.0"}
-            )
+            headers = {
+                "User-Agent": USER_AGENT,
+                "Accept": "application/vnd.github+json",
+            }
+            # Revalidate an expired entry instead of re-downloading: a 304
+            # answer carries no body and is cheap on the rate limit
+            etag = self._cache.get_etag(repo)
+            if etag:
+                headers["If-None-Match"] = etag
+            req = urllib.request.Request(url, headers=headers)
             with urllib.request.urlopen(req, timeout=10) as response:
-                data = json.loads(response.read().decode())
+                # json.loads handles bytes directly; skipping .decode()
+                # avoids a full extra pass over a 50-500 KB payload
+                data = json.loads(response.read())
                 result = {
                     "version": data.get("tag_name", "").lstrip("v"),
                     "description": data.get("body", "")[:200] if data.get("body") else None,
-                    "assets": data.get("assets", []),
+                    # Keep only the asset fields we use; the full entries
+                    # carry uploader objects and a dozen URLs each, which
+                    # would otherwise be serialized into the cache
+                    "assets": [
+                        {
+                            "name": a.get("name"),
+                            "browser_download_url": a.get("browser_download_url"),
+                        }
+                        for a in data.get("assets", [])
+                    ],
                 }
                 
-                # Cache the result
-                self._cache[repo] = (time.time(), result)
-                self._save_cache()
-                
+                # Cache the result - a single-row upsert, not a full rewrite
+                self._cache.put(repo, result, etag=response.headers.get("ETag"))
+                self._remember_hot(repo, result)
+
                 return result
         except urllib.error.HTTPError as e:
+            if e.code == 304:
+                # Release unchanged since we last saw it; re-stamp the
+                # entry and serve the stored data
+                cached = self._cache.get(repo, allow_stale=True)
+                if cached is not None:
+                    logger.debug(f"Release for {repo} unchanged (304)")
+                    self._cache.touch(repo)
+                    self._remember_hot(repo, cached)
+                    return cached
             if e.code == 403 or e.code == 429:
                 logger.warning(f"GitHub rate limit reached for {repo}")
                 # Check if we have stale cache (even if expired)
-                if repo in self._cache:
+                stale = self._cache.get(repo, allow_stale=True)
+                if stale is not None:
                     logger.info(f"Using stale cache for {repo} due to rate limit")
-                    return self._cache[repo][1]
-                
+                    return stale
+
                 # Check fallback data
                 if repo in self.FALLBACK_DATA:
                     logger.info(f"Using fallback data for {repo} due to rate limit (cold start)")
@@ -242,9 +398,10 @@ class FlatpakMigrator:
         except Exception as e:
             logger.debug(f"Failed to fetch GitHub info for {repo}: {e}")
             # Also fallback to stale cache on other errors
-            if repo in self._cache:
-                return self._cache[repo][1]
-            
+            stale = self._cache.get(repo, allow_stale=True)
+            if stale is not None:
+                return stale
+
             # Check fallback data
             if repo in self.FALLBACK_DATA:
                 return self.FALLBACK_DATA[repo]
@@ -254,8 +411,8 @@ class FlatpakMigrator:
     def _normalize_version(self, version: str) -> str:
         """Normalize version string for comparison."""
         # Remove common prefixes and suffixes
-        v = version.strip().lstrip("v").split("-")[0].split("~")[0]
-        return v
+        m = _VERSION_PREFIX_RE.match(version)
+        return m.group(1) if m else version
     
     def _version_is_newer(self, new_ver: str, old_ver: str) -> bool:
         """Compare versions, return True if new_ver is newer than old_ver."""
@@ -335,16 +492,52 @@ class FlatpakMigrator:
             return None
         
         backup_path = Path("/tmp") / f"uum_backup_{app_id}"
-        
+
         try:
             if backup_path.exists():
                 shutil.rmtree(backup_path)
+
+            # Prefer cp --reflink=auto: a metadata-only snapshot on
+            # btrfs/xfs, and cp falls back to a plain copy elsewhere -
+            # either way no bytes flow through Python
+            try:
+                subprocess.run(
+                    ["cp", "--reflink=auto", "-a",
+                     str(flatpak_data), str(backup_path)],
+                    check=True,
+                    capture_output=True,
+                    timeout=600,
+                )
+                logger.info(f"Backed up {flatpak_data} to {backup_path}")
+                return backup_path
+            except (subprocess.SubprocessError, FileNotFoundError):
+                shutil.rmtree(backup_path, ignore_errors=True)
+
+            # Next best: mirror the tree with hardlinks (O(files) metadata,
+            # zero data copied). Fails across filesystems, e.g. tmpfs /tmp.
+            try:
+                self._hardlink_tree(flatpak_data, backup_path)
+                logger.info(f"Backed up {flatpak_data} to {backup_path} (hardlinks)")
+                return backup_path
+            except OSError:
+                shutil.rmtree(backup_path, ignore_errors=True)
+
+            # Last resort: full deep copy
             shutil.copytree(flatpak_data, backup_path)
             logger.info(f"Backed up {flatpak_data} to {backup_path}")
             return backup_path
         except Exception as e:
             logger.error(f"Failed to backup data: {e}")
             return None
+
+    def _hardlink_tree(self, src: Path, dst: Path):
+        """Mirror a directory tree into dst using hardlinks for files."""
+        for dirpath, _dirnames, filenames in os.walk(src):
+            rel = os.path.relpath(dirpath, src)
+            target_dir = dst if rel == "." else dst / rel
+            target_dir.mkdir(parents=True, exist_ok=True)
+            for name in filenames:
+                os.link(os.path.join(dirpath, name), target_dir / name)
     
     def _restore_data_to_native(self, app_id: str, backup_path: Path) -> bool:
         """Restore backed up data to native XDG locations."""
@@ -372,10 +565,14 @@ class FlatpakMigrator:
                         if item.is_dir():
                             if item_dest.exists():
                                 shutil.rmtree(item_dest)
-                            shutil.copytree(item, item_dest)
+                            item_dest.parent.mkdir(parents=True, exist_ok=True)
                         else:
                             item_dest.parent.mkdir(parents=True, exist_ok=True)
-                            shutil.copy2(item, item_dest)
+                        # The backup is deleted after migration anyway, so
+                        # move instead of copying: a rename (O(1) metadata)
+                        # on the same filesystem, with shutil falling back
+                        # to a copy across devices
+                        shutil.move(str(item), str(item_dest))
                         restored = True
                         logger.info(f"Restored: {item} -> {item_dest}")
             except Exception as e:
@@ -388,9 +585,46 @@ class FlatpakMigrator:
         flatpak_data = Path.home() / ".var/app" / app_id
         if not flatpak_data.exists():
             return 0
-        
+
+        def walk_size(root: str) -> int:
+            # Iterative scandir walk: DirEntry caches type and stat info
+            # from the directory read, so no extra stat() per file and no
+            # Path object churn like rglob
+            total = 0
+            stack = [root]
+            while stack:
+                try:
+                    with os.scandir(stack.pop()) as entries:
+                        for entry in entries:
+                            try:
+                                if entry.is_dir(follow_symlinks=False):
+                                    stack.append(entry.path)
+                                elif entry.is_file(follow_symlinks=False):
+                                    total += entry.stat(
+                                        follow_symlinks=False
+                                    ).st_size
+                            except OSError:
+                                continue
+                except OSError:
+                    continue
+            return total
+
+        # Walk top-level subtrees (config/, data/, cache/, ...) from a
+        # small pool; the deep ones dominate and split naturally
         total = 0
-        for path in flatpak_data.rglob("*"):
-            if path.is_file():
-                total += path.stat().st_size
+        subtrees = []
+        try:
+            with os.scandir(flatpak_data) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        subtrees.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        total += entry.stat(follow_symlinks=False).st_size
+        except OSError:
+            return 0
+
+        if subtrees:
+            with ThreadPoolExecutor(max_workers=min(4, len(subtrees))) as executor:
+                total += sum(executor.map(walk_size, subtrees))
+
         return total
@@ -3,19 +3,28 @@ Universal Update Manager - Update History and Notifications
 Tracks update history and provides native desktop notifications.
 """
 
+import heapq
 import json
 import logging
 import os
+import shutil
 import subprocess
+from collections import Counter
+from itertools import pairwise
+from operator import attrgetter
 from pathlib import Path
 from datetime import datetime
-from dataclasses import dataclass, asdict, field
+from dataclasses import dataclass, asdict
 from typing import Optional, List
 
 logger = logging.getLogger(__name__)
 
+# Resolved once at import: a PATH scan in-process instead of forking
+# `which` per NotificationManager instance
+_NOTIFY_SEND = shutil.which("notify-send")
 
-@dataclass
+
+@dataclass(slots=True)
 class UpdateRecord:
     """Record of a single update operation."""
     software_id: str
@@ -36,35 +45,98 @@ class UpdateHistory:
     def __init__(self, history_file: Optional[Path] = None):
         """
         Initialize update history.
-        
+
         Args:
-            history_file: Path to history JSON file. Defaults to ~/.config/uum/history.json
+            history_file: Path to history file. Defaults to ~/.config/uum/history.jsonl
         """
         xdg_config = Path(os.environ.get("XDG_CONFIG_HOME", Path.home() / ".config"))
-        self.history_file = history_file or (xdg_config / "uum" / "history.json")
+        self.history_file = history_file or (xdg_config / "uum" / "history.jsonl")
         self.history_file.parent.mkdir(parents=True, exist_ok=True)
         self._load_history()
+        self._rebuild_stats()
 
     def _load_history(self):
-        """Load history from disk."""
+        """Load history from disk, migrating the old JSON format if found."""
         self.records: List[UpdateRecord] = []
+
+        legacy_file = self.history_file.with_suffix(".json")
+        migrating = False
+
         if self.history_file.exists():
+            # Stream the JSONL file line by line: one record is in flight
+            # at a time instead of the whole file plus a split copy
             try:
-                with open(self.history_file) as f:
-                    data = json.load(f)
-                    for record in data.get("records", []):
-                        self.records.append(UpdateRecord(**record))
+                with open(self.history_file, "rb") as f:
+                    for lineno, line in enumerate(f):
+                        if not line.strip():
+                            continue
+                        try:
+                            entry = json.loads(line)
+                        except json.JSONDecodeError:
+                            if lineno == 0:
+                                # Not line-delimited after all (e.g. a
+                                # pretty-printed document saved under the
+                                # .jsonl name): fall back to a full parse
+                                self._load_whole_file(
+                                    self.history_file.read_bytes()
+                                )
+                                return
+                            raise
+                        self.records.append(UpdateRecord(**entry))
             except Exception as e:
                 logger.warning(f"Failed to load history: {e}")
+            return
+
+        if legacy_file != self.history_file and legacy_file.exists():
+            self._load_whole_file(legacy_file.read_bytes())
+            migrating = True
+        else:
+            return
+
+        if migrating:
+            self._save_history()
+            try:
+                legacy_file.unlink()
+            except OSError:
+                pass
+
+    def _load_whole_file(self, raw: bytes):
+        """Parse a complete JSON document (legacy format or single value)."""
+        try:
+            data = json.loads(raw)
+            if isinstance(data, dict) and "records" in data:
+                entries = data["records"]
+            else:
+                entries = [data]
+            for entry in entries:
+                self.records.append(UpdateRecord(**entry))
+        except Exception as e:
+            logger.warning(f"Failed to load history: {e}")
+
+    def _rebuild_stats(self):
+        """Recompute the cached aggregates from the full record list."""
+        self._by_source = Counter(r.source_type for r in self.records)
+        self._successful = sum(1 for r in self.records if r.success)
 
     def _save_history(self):
-        """Save history to disk."""
+        """Rewrite the whole history file (only after trims/migrations)."""
         try:
-            with open(self.history_file, 'w') as f:
-                json.dump(
-                    {"records": [asdict(r) for r in self.records]},
-                    f, indent=2
-                )
+            # Atomic rewrite: a crash mid-write can't truncate the history
+            tmp = self.history_file.with_suffix(self.history_file.suffix + ".tmp")
+            with open(tmp, "w") as f:
+                for r in self.records:
+                    f.write(json.dumps(asdict(r), separators=(",", ":")))
+                    f.write("\n")
+            os.replace(tmp, self.history_file)
+        except Exception as e:
+            logger.error(f"Failed to save history: {e}")
+
+    def _append_record(self, record: UpdateRecord):
+        """Append one JSONL line - O(1) disk work however long the history."""
+        try:
+            with open(self.history_file, "a") as f:
+                f.write(json.dumps(asdict(record), separators=(",", ":")))
+                f.write("\n")
         except Exception as e:
             logger.error(f"Failed to save history: {e}")
 
@@ -99,12 +171,16 @@ class UpdateHistory:
             backup_id=backup_id,
         )
         self.records.append(record)
-        self._save_history()
+        self._by_source[source_type] += 1
+        self._successful += int(success)
+        self._append_record(record)
         return record
 
     def get_recent(self, count: int = 20) -> List[UpdateRecord]:
         """Get most recent update records."""
-        return sorted(self.records, key=lambda r: r.timestamp, reverse=True)[:count]
+        # Bounded heap instead of a full sort: O(N log count) and no
+        # full-length copy for the usual count=20 over hundreds of records
+        return heapq.nlargest(count, self.records, key=attrgetter("timestamp"))
 
     def get_by_software(self, software_id: str) -> List[UpdateRecord]:
         """Get all records for a specific software."""
@@ -115,50 +191,102 @@ class UpdateHistory:
         return [r for r in self.records if not r.success]
 
     def get_stats(self) -> dict:
-        """Get update statistics."""
+        """Get update statistics (O(1), served from cached aggregates)."""
         total = len(self.records)
-        successful = sum(1 for r in self.records if r.success)
+        successful = self._successful
         failed = total - successful
-        
-        by_source = {}
-        for r in self.records:
-            by_source[r.source_type] = by_source.get(r.source_type, 0) + 1
-        
+
         return {
             "total": total,
             "successful": successful,
             "failed": failed,
             "success_rate": successful / total if total > 0 else 1.0,
-            "by_source": by_source,
+            "by_source": dict(self._by_source),
         }
 
     def clear_old(self, max_records: int = 500):
         """Keep only the most recent records."""
-        if len(self.records) > max_records:
+        if len(self.records) <= max_records:
+            return
+        # add_record appends in timestamp order, so the common case is a
+        # plain O(max_records) tail slice; only a loaded file that is out
+        # of order pays for a sort
+        if all(a.timestamp <= b.timestamp for a, b in pairwise(self.records)):
+            self.records = self.records[-max_records:]
+        else:
             self.records = sorted(
-                self.records, key=lambda r: r.timestamp, reverse=True
-            )[:max_records]
-            self._save_history()
+                self.records, key=attrgetter("timestamp")
+            )[-max_records:]
+        self._rebuild_stats()
+        self._save_history()
 
 
 class NotificationManager:
     """Manages desktop notifications for update events."""
 
+    # Maps urgency names to org.freedesktop.Notifications hint bytes
+    _URGENCY_LEVELS = {"low": 0, "normal": 1, "critical": 2}
+
     def __init__(self):
         """Initialize notification manager."""
-        self._check_notify_send()
+        self._has_notify_send = _NOTIFY_SEND is not None
+        # Lazily-opened session bus; one persistent connection replaces a
+        # notify-send fork+exec (plus its own bus handshake) per call
+        self._bus = None
+        self._bus_failed = False
+        self._glib = None
+
+    def _get_bus(self):
+        """Open the session bus once; None if DBus/gi is unavailable."""
+        if self._bus is None and not self._bus_failed:
+            try:
+                from gi.repository import Gio, GLib
+                self._bus = Gio.bus_get_sync(Gio.BusType.SESSION, None)
+                self._gio = Gio
+                self._glib = GLib
+            except Exception as e:
+                logger.debug(f"Session bus unavailable: {e}")
+                self._bus_failed = True
+        return self._bus
 
-    def _check_notify_send(self):
-        """Check if notify-send is available."""
+    def _notify_dbus(
+        self, title: str, body: str, icon: str, urgency: str, timeout_ms: int
+    ) -> bool:
+        """Send one Notify call over the shared session bus connection."""
+        bus = self._get_bus()
+        if bus is None:
+            return False
         try:
-            result = subprocess.run(
-                ["which", "notify-send"],
-                capture_output=True,
-                timeout=5
+            GLib = self._glib
+            params = GLib.Variant(
+                "(susssasa{sv}i)",
+                (
+                    "Universal Update Manager",
+                    0,  # replaces_id: always a new notification
+                    icon,
+                    title,
+                    body,
+                    [],  # actions
+                    {"urgency": GLib.Variant(
+                        "y", self._URGENCY_LEVELS.get(urgency, 1))},
+                    timeout_ms,
+                ),
+            )
+            bus.call_sync(
+                "org.freedesktop.Notifications",
+                "/org/freedesktop/Notifications",
+                "org.freedesktop.Notifications",
+                "Notify",
+                params,
+                GLib.VariantType("(u)"),
+                self._gio.DBusCallFlags.NONE,
+                5000,
+                None,
             )
-            self._has_notify_send = result.returncode == 0
-        except Exception:
-            self._has_notify_send = False
+            return True
+        except Exception as e:
+            logger.debug(f"DBus notification failed: {e}")
+            return False
 
     def notify(
         self,
@@ -181,14 +309,19 @@ class NotificationManager:
         Returns:
             True if notification was sent successfully
         """
+        # Preferred path: direct DBus call on the shared connection
+        if self._notify_dbus(title, body, icon, urgency, timeout_ms):
+            return True
+
+        # Fallback: fork notify-send
         if not self._has_notify_send:
             logger.debug("notify-send not available")
             return False
-        
+
         try:
             subprocess.run(
                 [
-                    "notify-send",
+                    _NOTIFY_SEND,  # Absolute path: no PATH lookup per call
                     title,
                     body,
                     "-i", icon,
@@ -196,7 +329,10 @@ class NotificationManager:
                     "-t", str(timeout_ms),
                     "-a", "Universal Update Manager",
                 ],
-                capture_output=True,
+                # Output is never read: DEVNULL skips the pipes and the
+                # reader threads capture_output would set up
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
                 timeout=5,
             )
             return True
@@ -6,16 +6,59 @@ Automatically detects software installed outside of APT.
 import subprocess
 import re
 import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from dataclasses import dataclass, field
 from typing import Optional
 import logging
 import json
 
+try:
+    from core.github_db import find_matching_github_app
+except ImportError:
+    find_matching_github_app = None
+
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@lru_cache(maxsize=1024)
+def _cached_github_match(
+    desktop_name: Optional[str],
+    executable_name: Optional[str],
+    app_name: Optional[str],
+):
+    """Memoized wrapper so identical queries hit the database only once."""
+    return find_matching_github_app(
+        desktop_file_name=desktop_name,
+        executable_name=executable_name,
+        app_name=app_name,
+    )
+
+# Version embedded in an AppImage filename, e.g. "Joplin-2.13.9.AppImage".
+# Compiled once; matched against every scanned filename.
+_APPIMAGE_VERSION_RE = re.compile(r"[-_](\d+(?:\.\d+)+)")
+
+# _prettify_name helpers, compiled once instead of per call
+_NAME_SUFFIX_RE = re.compile(r"[-_](amd64|x64|linux|bin)$", re.I)
+_NAME_SEP_RE = re.compile(r"[-_]")
+
+# Roots used to classify where a .desktop file lives
+_USR_SHARE = Path("/usr/share")
+_LOCAL_APPS = Path.home() / ".local"
+
+# Which detection wins when the same app is found by several scans:
+# APT-backed entries carry the best metadata, then XDG, then the rest
+_TYPE_PRIORITY = {"xdg-system": 3, "xdg-local": 2, "appimage": 1, "opt": 0, "dpkg": 0}
+
+
+def _merge_priority(software: "DetectedSoftware") -> int:
+    if software.install_type == "xdg-system" and software.known_source == "apt":
+        return 4
+    return _TYPE_PRIORITY.get(software.install_type, 0)
+
+
+@dataclass(slots=True)
 class DetectedSoftware:
     """Represents a detected software installation."""
     id: str
@@ -87,6 +130,18 @@ class SoftwareScanner:
         """Initialize the scanner."""
         self.config_path = config_path
         self.user_config = self._load_user_config()
+        self._rebuild_source_map()
+
+    def _rebuild_source_map(self):
+        """Merge built-in and user sources into one lookup table.
+
+        User-configured sources win over the built-ins, same as the old
+        check-user-first logic, but matching costs a single dict get.
+        """
+        self._source_map = {
+            **self.KNOWN_SOFTWARE,
+            **self.user_config.get("custom_sources", {}),
+        }
     
     def _load_user_config(self) -> dict:
         """Load user-configured sources."""
@@ -118,17 +173,8 @@ class SoftwareScanner:
         
         def merge(detected_list):
             for s in detected_list:
-                if s.id in unique_software:
-                    # Merge rules:
-                    # 1. Prefer APT (xdg-system with valid package) over anything else
-                    existing = unique_software[s.id]
-                    if s.install_type == "xdg-system" and s.known_source == "apt":
-                         unique_software[s.id] = s
-                    # 2. Prefer XDG over /opt (better metadata)
-                    elif s.install_type.startswith("xdg-") and existing.install_type == "opt":
-                         unique_software[s.id] = s
-                    # 3. Otherwise keep existing (first come priority, or specific logic)
-                else:
+                existing = unique_software.get(s.id)
+                if existing is None or _merge_priority(s) > _merge_priority(existing):
                     unique_software[s.id] = s
 
         # Scan XDG applications (.desktop files) - High quality metadata
@@ -160,7 +206,8 @@ class SoftwareScanner:
             # Get list of installed packages
             result = subprocess.run(
                 ["dpkg-query", "-W", "-f=${Package}\\t${Version}\\n"],
-                capture_output=True, text=True, timeout=30
+                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                text=True, timeout=30
             )
             
             if result.returncode != 0:
@@ -172,47 +219,71 @@ class SoftwareScanner:
                     pkg, ver = line.split("\t", 1)
                     packages.append((pkg, ver))
             
-            # Check each package's APT status
+            # Classify all packages with batched apt-cache calls instead
+            # of one fork per package
+            orphans = self._find_orphan_packages([pkg for pkg, _ in packages])
             for pkg, ver in packages:
-                if self._is_orphan_package(pkg):
+                if pkg in orphans:
                     detected.append(DetectedSoftware(
                         id=pkg,
                         name=self._prettify_name(pkg),
                         version=ver,
                         install_type="dpkg",
                     ))
-        
+
         except (subprocess.TimeoutExpired, FileNotFoundError) as e:
             logger.warning(f"Failed to scan dpkg: {e}")
-        
+
         return detected
-    
-    def _is_orphan_package(self, package: str) -> bool:
-        """Check if a package is installed but not from any APT repo."""
-        try:
-            result = subprocess.run(
-                ["apt-cache", "policy", package],
-                capture_output=True, text=True, timeout=5
-            )
-            
-            # If package has 500 priority from http source, it's from a repo
-            if "500 http" in result.stdout or "500 https" in result.stdout:
-                return False
-            
-            # If only 100 (local status), it's an orphan
-            return "100 /var/lib/dpkg/status" in result.stdout
-            
-        except (subprocess.TimeoutExpired, FileNotFoundError):
-            return False
+
+    def _find_orphan_packages(self, packages: list[str]) -> set[str]:
+        """Find packages installed but not available from any APT repo.
+
+        Runs apt-cache policy on chunks of ~500 packages (argv length
+        safety) and splits the combined output into per-package stanzas,
+        so a system with thousands of packages costs a handful of
+        subprocesses instead of one each.
+        """
+        orphans: set[str] = set()
+
+        def classify(name: Optional[str], from_repo: bool, local_only: bool):
+            # Orphan: only known to the local dpkg status, no repo source
+            if name and local_only and not from_repo:
+                orphans.add(name)
+
+        for start in range(0, len(packages), 500):
+            chunk = packages[start:start + 500]
+            try:
+                result = subprocess.run(
+                    ["apt-cache", "policy", *chunk],
+                    stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                    text=True, timeout=60
+                )
+            except (subprocess.TimeoutExpired, FileNotFoundError):
+                break
+
+            # Stanzas begin with an unindented "<package>:" line
+            name = None
+            from_repo = False
+            local_only = False
+            for line in result.stdout.splitlines():
+                if line and not line[0].isspace() and line.endswith(":"):
+                    classify(name, from_repo, local_only)
+                    name = line[:-1]
+                    from_repo = False
+                    local_only = False
+                elif "500 http" in line:
+                    from_repo = True
+                elif "100 /var/lib/dpkg/status" in line:
+                    local_only = True
+            classify(name, from_repo, local_only)
+
+        return orphans
     
     def _scan_opt_directory(self) -> list[DetectedSoftware]:
         """Scan /opt for installed applications."""
         detected = []
-        opt_path = Path("/opt")
-        
-        if not opt_path.exists():
-            return detected
-        
+
         # Known patterns to detect version
         version_files = [
             "version.txt",
@@ -221,82 +292,154 @@ class SoftwareScanner:
             "product.json",
             "build.txt",
         ]
-        
-        for entry in opt_path.iterdir():
-            if not entry.is_dir():
-                continue
-            
-            # Skip system directories
-            if entry.name in ("containerd", "google"):
-                continue
-            
-            software_id = entry.name.lower().replace(" ", "-")
-            version = self._detect_opt_version(entry, version_files)
-            
-            detected.append(DetectedSoftware(
-                id=software_id,
-                name=self._prettify_name(entry.name),
-                version=version or "unknown",
-                install_type="opt",
-                install_path=str(entry),
-            ))
-        
+
+        try:
+            # scandir's DirEntry carries the type info from the directory
+            # read itself - no extra stat per entry like iterdir
+            with os.scandir("/opt") as entries:
+                for entry in entries:
+                    if not entry.is_dir():
+                        continue
+
+                    # Skip system directories
+                    if entry.name in ("containerd", "google"):
+                        continue
+
+                    software_id = entry.name.lower().replace(" ", "-")
+                    version = self._detect_opt_version(Path(entry.path), version_files)
+
+                    detected.append(DetectedSoftware(
+                        id=software_id,
+                        name=self._prettify_name(entry.name),
+                        version=version or "unknown",
+                        install_type="opt",
+                        install_path=entry.path,
+                    ))
+        except OSError:
+            pass
+
         return detected
     
     def _detect_opt_version(self, path: Path, version_files: list[str]) -> Optional[str]:
         """Try to detect version from common version files."""
-        for vf in version_files:
-            vf_path = path / vf
-            if not vf_path.exists():
-                # Also check in resources/app for Electron apps
-                vf_path = path / "resources" / "app" / vf
-            
-            if vf_path.exists():
+
+        def read_version(directory: Path) -> Optional[str]:
+            # One directory listing replaces up to five existence probes
+            try:
+                with os.scandir(directory) as entries:
+                    names = {e.name for e in entries}
+            except OSError:
+                return None
+
+            for vf in version_files:
+                if vf not in names:
+                    continue
                 try:
-                    content = vf_path.read_text()
-                    
+                    content = (directory / vf).read_text()
+
                     if vf.endswith(".json"):
                         data = json.loads(content)
-                        return data.get("version") or data.get("ideVersion")
+                        version = data.get("version") or data.get("ideVersion")
                     else:
                         # Just return first line for txt files
-                        return content.strip().split("\n")[0]
+                        version = content.strip().split("\n")[0]
+                    if version:
+                        return version
                 except Exception:
                     pass
-        
-        return None
+            return None
+
+        # Also check in resources/app for Electron apps
+        return read_version(path) or read_version(path / "resources" / "app")
     
     def _scan_appimages(self) -> list[DetectedSoftware]:
         """Scan for AppImage files."""
         detected = []
-        
+
+        home = Path.home()
         search_paths = [
-            Path.home() / "Applications",
-            Path.home() / ".local" / "bin",
-            Path.home() / "AppImages",
+            home / "Applications",
+            home / ".local" / "bin",
+            home / "AppImages",
         ]
-        
+
+        # The same AppImage is often linked into several of these dirs;
+        # track inodes so it's only reported once
+        seen_inodes: set[int] = set()
+
         for search_path in search_paths:
-            if not search_path.exists():
+            try:
+                with os.scandir(search_path) as entries:
+                    for entry in entries:
+                        if not entry.name.endswith(".AppImage") or not entry.is_file():
+                            continue
+
+                        inode = entry.stat().st_ino
+                        if inode in seen_inodes:
+                            continue
+                        seen_inodes.add(inode)
+
+                        name = entry.name.removesuffix(".AppImage")
+                        # Try to extract version from filename
+                        version_match = _APPIMAGE_VERSION_RE.search(name)
+                        version = version_match.group(1) if version_match else "unknown"
+
+                        detected.append(DetectedSoftware(
+                            id=name.lower().replace(" ", "-"),
+                            name=self._prettify_name(name.split("-")[0]),
+                            version=version,
+                            install_type="appimage",
+                            install_path=entry.path,
+                            executable=entry.path,
+                        ))
+            except OSError:
                 continue
-            
-            for appimage in search_path.glob("*.AppImage"):
-                name = appimage.stem
-                # Try to extract version from filename
-                version_match = re.search(r"[-_](\d+(?:\.\d+)+)", name)
-                version = version_match.group(1) if version_match else "unknown"
-                
-                detected.append(DetectedSoftware(
-                    id=name.lower().replace(" ", "-"),
-                    name=self._prettify_name(name.split("-")[0]),
-                    version=version,
-                    install_type="appimage",
-                    install_path=str(appimage),
-                    executable=str(appimage),
-                ))
-        
+
         return detected
 
+    # The only [Desktop Entry] keys the scanner reads
+    _DESKTOP_KEYS = frozenset(
+        {"Name", "Exec", "Type", "NoDisplay", "Comment", "Version", "X-Version"}
+    )
+
+    def _parse_desktop_entry(self, path: Path) -> Optional[dict]:
+        """Minimal .desktop reader for the handful of keys we use.
+
+        One read + one pass over the lines of the [Desktop Entry] section;
+        a full ConfigParser per file parses every section and allocates
+        far more than this scan needs. Returns None for files that are
+        hidden, not applications, or unreadable.
+        """
+        try:
+            text = path.read_bytes().decode("utf-8", "replace")
+        except OSError:
+            return None
+
+        entry: dict[str, str] = {}
+        in_entry = saw_entry = False
+        for line in text.split("\n"):
+            if line.startswith("["):
+                if in_entry:
+                    break  # Left [Desktop Entry]; nothing else matters
+                in_entry = line.strip() == "[Desktop Entry]"
+                saw_entry = saw_entry or in_entry
+                continue
+            if not in_entry or not line or line.startswith("#"):
+                continue
+            key, sep, value = line.partition("=")
+            if sep:
+                key = key.strip()
+                if key in self._DESKTOP_KEYS and key not in entry:
+                    entry[key] = value.strip()
+
+        if not saw_entry:
+            return None
+        if entry.get("NoDisplay", "").strip().lower() in ("true", "1", "yes", "on"):
+            return None
+        if entry.get("Type") != "Application":
+            return None
+        return entry
+
     def _scan_xdg_applications(self) -> list[DetectedSoftware]:
         """
         Scan standard XDG application directories for .desktop files.
@@ -304,8 +447,7 @@ class SoftwareScanner:
         Optimized to use batched dpkg calls.
         """
         detected = []
-        import configparser
-        
+
         # Directories to scan (priority order: user > system)
         xdg_dirs = [
             Path.home() / ".local" / "share" / "applications",
@@ -317,21 +459,26 @@ class SoftwareScanner:
         seen_ids = set()
         
         for d in xdg_dirs:
-            if not d.exists():
+            try:
+                with os.scandir(d) as entries:
+                    for f in entries:
+                        if not f.name.endswith(".desktop"):
+                            continue
+                        app_id = f.name.removesuffix(".desktop")
+                        if app_id not in seen_ids:
+                            desktop_files.append(Path(f.path))
+                            seen_ids.add(app_id)
+            except OSError:
                 continue
-            for f in d.glob("*.desktop"):
-                app_id = f.stem
-                if app_id not in seen_ids:
-                    desktop_files.append(f)
-                    seen_ids.add(app_id)
         
         # 2. Batch resolve via dpkg -S
         # Map: file_path -> (package, version, description)
         pkg_map = {}
         
         try:
-            # We can only check files that exist and are absolute paths
-            paths_to_check = [str(f.absolute()) for f in desktop_files]
+            # xdg_dirs are absolute, so the globbed paths already are too -
+            # no .absolute() (and its getcwd call) needed per file
+            paths_to_check = [str(f) for f in desktop_files]
             
             # dpkg -S accepts multiple arguments. 
             # Output format: "package: /path/to/file"
@@ -340,7 +487,10 @@ class SoftwareScanner:
             # 200 files * 100 chars = 20KB, so safe to batch all.
             if paths_to_check:
                 cmd = ["dpkg", "-S"] + paths_to_check
-                res = subprocess.run(cmd, capture_output=True, text=True)
+                res = subprocess.run(
+                    cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                    text=True,
+                )
                 # Ignore duplicate/not found errors, just parse stdout
                 
                 # Map: path -> package_name
@@ -360,7 +510,11 @@ class SoftwareScanner:
                 pkg_info = {}
                 if detected_packages:
                     cmd_query = ["dpkg-query", "-W", "-f=${Package}|${Version}|${Description}\\n"] + list(detected_packages)
-                    res_query = subprocess.run(cmd_query, capture_output=True, text=True)
+                    res_query = subprocess.run(
+                        cmd_query,
+                        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                        text=True,
+                    )
                     
                     for line in res_query.stdout.splitlines():
                         if "|" in line:
@@ -380,115 +534,107 @@ class SoftwareScanner:
             logger.debug(f"Batch dpkg resolution failed: {e}")
 
         # 5. Process files with updated info
-        for desktop_file in desktop_files:
+        def process_one(desktop_file: Path) -> Optional[DetectedSoftware]:
             try:
-                config = configparser.ConfigParser(interpolation=None)
-                config.read(desktop_file)
-                
-                if "Desktop Entry" not in config:
-                    continue
-                
-                entry = config["Desktop Entry"]
-                
-                if entry.getboolean("NoDisplay", fallback=False):
-                    continue
-                
-                if entry.get("Type") != "Application":
-                    continue
-                
+                entry = self._parse_desktop_entry(desktop_file)
+                if entry is None:
+                    return None
+
                 app_id = desktop_file.stem
                 name = entry.get("Name", app_id)
                 exec_cmd = entry.get("Exec", "").split()[0] if entry.get("Exec") else None
-                
+
                 if exec_cmd and "flatpak" in exec_cmd:
-                    continue
-                    
-                # Look up in our batch-resolved map
-                pkg_name, pkg_ver, pkg_desc = pkg_map.get(str(desktop_file.absolute()), (None, None, None))
-                
+                    return None
+
+                # Look up in our batch-resolved map (paths are absolute
+                # already; keep the string around for the checks below)
+                file_path = str(desktop_file)
+                pkg_name, pkg_ver, pkg_desc = pkg_map.get(
+                    file_path, (None, None, None)
+                )
+
                 version = pkg_ver or entry.get("X-Version") or entry.get("Version") or "unknown"
                 description = pkg_desc or entry.get("Comment")
-                
+
+                # Compare path components rather than scanning for
+                # substrings (which could also match inside filenames)
                 install_type = "xdg-local"
-                if "/usr/share" in str(desktop_file):
+                if desktop_file.is_relative_to(_USR_SHARE):
                     install_type = "xdg-system"
-                elif ".local" in str(desktop_file):
+                elif desktop_file.is_relative_to(_LOCAL_APPS):
                     install_type = "xdg-local"
-                
+
                 # If resolved to a package, verify it's system
                 if pkg_name:
                     install_type = "xdg-system"
 
-                detected.append(DetectedSoftware(
+                return DetectedSoftware(
                     id=pkg_name if pkg_name else app_id,
                     name=name,
                     version=version,
                     install_type=install_type,
-                    install_path=str(desktop_file),
+                    install_path=file_path,
                     executable=exec_cmd,
                     description=description,
                     known_source="apt" if pkg_name else None
-                ))
-
+                )
             except Exception as e:
                 logger.debug(f"Failed to parse {desktop_file}: {e}")
-        
+                return None
+
+        # Each file is an independent read+parse, so overlap the I/O from
+        # a small pool; below a handful of files the threads cost more
+        # than they save. map() keeps input order either way.
+        if len(desktop_files) < 16:
+            results = map(process_one, desktop_files)
+        else:
+            executor = ThreadPoolExecutor(max_workers=8)
+            with executor:
+                results = list(executor.map(process_one, desktop_files))
+
+        detected.extend(r for r in results if r is not None)
+
         return detected
     
     def _match_known_source(self, software: DetectedSoftware) -> None:
         """Match detected software with known update sources."""
-        # Check user config first
-        user_sources = self.user_config.get("custom_sources", {})
-        if software.id in user_sources:
-            software.known_source = user_sources[software.id].get("source")
-            software.known_config = user_sources[software.id]
-            return
-        
-        # Check built-in known sources
-        if software.id in self.KNOWN_SOFTWARE:
-            config = self.KNOWN_SOFTWARE[software.id]
+        # One lookup over the merged user + built-in source table
+        config = self._source_map.get(software.id)
+        if config is not None:
             software.known_source = config.get("source")
             software.known_config = config
             return
         
         # Try auto-matching with GitHub database
-        try:
-            from core.github_db import find_matching_github_app
-            
-            # Get desktop file name from install path or id
-            desktop_name = None
-            if software.install_path and ".desktop" in str(software.install_path):
-                desktop_name = Path(software.install_path).name
-            
-            matches = find_matching_github_app(
-                desktop_file_name=desktop_name,
-                executable_name=software.executable,
-                app_name=software.name,
-            )
-            
-            if matches:
-                # Use the best match (highest score)
-                best_match = matches[0]
-                software.known_source = "github"
-                software.known_config = {
-                    "source": "github",
-                    "repo": best_match.repo,
-                    "asset_pattern": best_match.asset_pattern,
-                    "install_type": best_match.install_type,
-                    "auto_matched": True,
-                    "match_name": best_match.name,
-                }
-                logger.debug(f"Auto-matched {software.name} to GitHub: {best_match.repo}")
-        except ImportError:
-            pass
+        if find_matching_github_app is None:
+            return
+
+        # Get desktop file name from install path or id
+        desktop_name = None
+        if software.install_path and ".desktop" in str(software.install_path):
+            desktop_name = Path(software.install_path).name
+
+        matches = _cached_github_match(desktop_name, software.executable, software.name)
+
+        if matches:
+            # Use the best match (highest score)
+            best_match = matches[0]
+            software.known_source = "github"
+            software.known_config = {
+                "source": "github",
+                "repo": best_match.repo,
+                "asset_pattern": best_match.asset_pattern,
+                "install_type": best_match.install_type,
+                "auto_matched": True,
+                "match_name": best_match.name,
+            }
+            logger.debug(f"Auto-matched {software.name} to GitHub: {best_match.repo}")
     
     def _prettify_name(self, name: str) -> str:
         """Convert package/folder name to display name."""
-        # Remove common suffixes
-        name = re.sub(r"[-_](amd64|x64|linux|bin)$", "", name, flags=re.I)
-        # Convert separators to spaces and capitalize
-        name = re.sub(r"[-_]", " ", name)
-        return name.title()
+        # Remove common suffixes, convert separators to spaces, capitalize
+        return _NAME_SEP_RE.sub(" ", _NAME_SUFFIX_RE.sub("", name)).title()
     
     def add_custom_source(self, software_id: str, source_config: dict) -> None:
         """Add a user-configured source for software."""
@@ -496,6 +642,7 @@ class SoftwareScanner:
             self.user_config["custom_sources"] = {}
         
         self.user_config["custom_sources"][software_id] = source_config
+        self._rebuild_source_map()
         self._save_user_config()
     
     def ignore_software(self, software_id: str) -> None:
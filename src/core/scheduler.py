@@ -4,13 +4,47 @@ Manages automatic update checking via systemd user timers.
 """
 
 import subprocess
+import time
 import logging
 from pathlib import Path
+from string import Template
 from typing import Optional
 from enum import Enum
 
 logger = logging.getLogger(__name__)
 
+# Unit file templates live at module scope so the rendered output is a
+# stable function of the substituted values alone - the skip-if-unchanged
+# check in _write_unit depends on byte-identical rendering across runs
+_SERVICE_TEMPLATE = Template("""[Unit]
+Description=Universal Update Manager - Check for Updates
+After=network-online.target
+Wants=network-online.target
+
+[Service]
+Type=oneshot
+ExecStart=/usr/bin/python3 $script
+Environment=DISPLAY=:0
+Environment=DBUS_SESSION_BUS_ADDRESS=unix:path=/run/user/%U/bus
+StandardOutput=journal
+StandardError=journal
+
+[Install]
+WantedBy=default.target
+""")
+
+_TIMER_TEMPLATE = Template("""[Unit]
+Description=Universal Update Manager - Check Timer
+
+[Timer]
+OnCalendar=$calendar
+RandomizedDelaySec=300
+Persistent=true
+
+[Install]
+WantedBy=timers.target
+""")
+
 
 class ScheduleFrequency(Enum):
     """Update check frequency options."""
@@ -25,48 +59,49 @@ class Scheduler:
 
     SERVICE_NAME = "uum-check"
     SYSTEMD_USER_DIR = Path.home() / ".config" / "systemd" / "user"
-    
+
+    # How long one `systemctl show` answer serves status queries; timer
+    # state is stable for far longer than a UI polling interval
+    STATUS_CACHE_TTL = 2.0
+
     def __init__(self):
         """Initialize the scheduler."""
         self.SYSTEMD_USER_DIR.mkdir(parents=True, exist_ok=True)
         self._service_file = self.SYSTEMD_USER_DIR / f"{self.SERVICE_NAME}.service"
         self._timer_file = self.SYSTEMD_USER_DIR / f"{self.SERVICE_NAME}.timer"
+        self._status_cache: Optional[tuple[float, dict]] = None
 
     def _get_check_script_path(self) -> Path:
         """Get path to the update check script."""
         # Script is in the same src directory
         return Path(__file__).parent.parent / "check_updates.py"
 
-    def _create_service_file(self, check_script: Path) -> bool:
-        """Create the systemd service file."""
-        service_content = f"""[Unit]
-Description=Universal Update Manager - Check for Updates
-After=network-online.target
-Wants=network-online.target
-
-[Service]
-Type=oneshot
-ExecStart=/usr/bin/python3 {check_script}
-Environment=DISPLAY=:0
-Environment=DBUS_SESSION_BUS_ADDRESS=unix:path=/run/user/%U/bus
-StandardOutput=journal
-StandardError=journal
+    def _write_unit(self, path: Path, content: str) -> Optional[bool]:
+        """Write a unit file only if its content changed.
 
-[Install]
-WantedBy=default.target
-"""
+        Returns True if the file was (re)written, False if it already
+        matched byte-for-byte, None on failure. Unchanged files let the
+        caller skip the daemon-reload entirely.
+        """
         try:
-            self._service_file.write_text(service_content)
-            logger.info(f"Created service file: {self._service_file}")
+            if path.exists() and path.read_text() == content:
+                return False
+            path.write_text(content)
+            logger.info(f"Created unit file: {path}")
             return True
         except Exception as e:
-            logger.error(f"Failed to create service file: {e}")
-            return False
+            logger.error(f"Failed to write unit file {path}: {e}")
+            return None
+
+    def _create_service_file(self, check_script: Path) -> Optional[bool]:
+        """Create the systemd service file (see _write_unit for returns)."""
+        content = _SERVICE_TEMPLATE.substitute(script=check_script)
+        return self._write_unit(self._service_file, content)
 
-    def _create_timer_file(self, frequency: ScheduleFrequency) -> bool:
-        """Create the systemd timer file."""
+    def _create_timer_file(self, frequency: ScheduleFrequency) -> Optional[bool]:
+        """Create the systemd timer file (see _write_unit for returns)."""
         if frequency == ScheduleFrequency.MANUAL:
-            return True
+            return False
         
         # Map frequency to systemd calendar spec
         calendar_specs = {
@@ -75,68 +110,54 @@ WantedBy=default.target
             ScheduleFrequency.WEEKLY: "Mon *-*-* 09:00:00",
         }
         
-        timer_content = f"""[Unit]
-Description=Universal Update Manager - Check Timer
-
-[Timer]
-OnCalendar={calendar_specs[frequency]}
-RandomizedDelaySec=300
-Persistent=true
+        content = _TIMER_TEMPLATE.substitute(calendar=calendar_specs[frequency])
+        return self._write_unit(self._timer_file, content)
 
-[Install]
-WantedBy=timers.target
-"""
-        try:
-            self._timer_file.write_text(timer_content)
-            logger.info(f"Created timer file: {self._timer_file}")
-            return True
-        except Exception as e:
-            logger.error(f"Failed to create timer file: {e}")
-            return False
+    def _query_timer(self) -> dict:
+        """Fetch timer state with one `systemctl show` call (cached briefly)."""
+        now = time.monotonic()
+        if (self._status_cache is not None
+                and now - self._status_cache[0] < self.STATUS_CACHE_TTL):
+            return self._status_cache[1]
 
-    def is_enabled(self) -> bool:
-        """Check if the update timer is enabled."""
+        props: dict[str, str] = {}
         try:
             result = subprocess.run(
-                ["systemctl", "--user", "is-enabled", f"{self.SERVICE_NAME}.timer"],
-                capture_output=True,
+                ["systemctl", "--user", "show", f"{self.SERVICE_NAME}.timer",
+                 "--property=UnitFileState,ActiveState,NextElapseUSecRealtime"],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
                 text=True,
                 timeout=10,
             )
-            return result.returncode == 0
+            if result.returncode == 0:
+                for line in result.stdout.splitlines():
+                    if "=" in line:
+                        key, _, value = line.partition("=")
+                        props[key] = value
         except Exception:
-            return False
+            pass
+
+        self._status_cache = (now, props)
+        return props
+
+    def _invalidate_status(self):
+        """Drop the cached timer state after changing it."""
+        self._status_cache = None
+
+    def is_enabled(self) -> bool:
+        """Check if the update timer is enabled."""
+        return self._query_timer().get("UnitFileState") in (
+            "enabled", "enabled-runtime"
+        )
 
     def is_active(self) -> bool:
         """Check if the update timer is currently active."""
-        try:
-            result = subprocess.run(
-                ["systemctl", "--user", "is-active", f"{self.SERVICE_NAME}.timer"],
-                capture_output=True,
-                text=True,
-                timeout=10,
-            )
-            return result.returncode == 0
-        except Exception:
-            return False
+        return self._query_timer().get("ActiveState") == "active"
 
     def get_next_run(self) -> Optional[str]:
         """Get the next scheduled run time."""
-        try:
-            result = subprocess.run(
-                ["systemctl", "--user", "show", f"{self.SERVICE_NAME}.timer",
-                 "--property=NextElapseUSecRealtime"],
-                capture_output=True,
-                text=True,
-                timeout=10,
-            )
-            if result.returncode == 0:
-                line = result.stdout.strip()
-                if "=" in line:
-                    return line.split("=", 1)[1]
-        except Exception:
-            pass
-        return None
+        return self._query_timer().get("NextElapseUSecRealtime") or None
 
     def enable(self, frequency: ScheduleFrequency = ScheduleFrequency.DAILY) -> bool:
         """
@@ -152,21 +173,26 @@ WantedBy=timers.target
             return self.disable()
         
         check_script = self._get_check_script_path()
-        
+
         # Create service and timer files
-        if not self._create_service_file(check_script):
+        wrote_service = self._create_service_file(check_script)
+        if wrote_service is None:
             return False
-        if not self._create_timer_file(frequency):
+        wrote_timer = self._create_timer_file(frequency)
+        if wrote_timer is None:
             return False
-        
+
         try:
-            # Reload systemd user daemon
-            subprocess.run(
-                ["systemctl", "--user", "daemon-reload"],
-                capture_output=True,
-                timeout=10,
-            )
-            
+            # Reload systemd user daemon - but only if a unit file
+            # actually changed; re-enabling with the same frequency
+            # shouldn't pay for a full user-unit rescan
+            if wrote_service or wrote_timer:
+                subprocess.run(
+                    ["systemctl", "--user", "daemon-reload"],
+                    capture_output=True,
+                    timeout=10,
+                )
+
             # Enable and start timer
             result = subprocess.run(
                 ["systemctl", "--user", "enable", "--now", f"{self.SERVICE_NAME}.timer"],
@@ -176,6 +202,7 @@ WantedBy=timers.target
             )
             
             if result.returncode == 0:
+                self._invalidate_status()
                 logger.info(f"Enabled update checking: {frequency.value}")
                 return True
             else:
@@ -194,6 +221,7 @@ WantedBy=timers.target
                 capture_output=True,
                 timeout=10,
             )
+            self._invalidate_status()
             logger.info("Disabled automatic update checking")
             return True
         except Exception as e:
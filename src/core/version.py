@@ -4,41 +4,80 @@ Provides consistent version comparison logic across all plugins.
 """
 
 import re
+from functools import lru_cache
 from typing import Tuple, List
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Resolved once at import: compare_versions is a hot path and shouldn't
+# pay an import-machinery lookup (or an ImportError per call) for an
+# optional dependency that either exists or doesn't
+try:
+    from packaging.version import (
+        Version as _Version,
+        InvalidVersion as _InvalidVersion,
+    )
+except ImportError:
+    _Version = _InvalidVersion = None
+
+_VER_RE = re.compile(r'\d+')
+
+
+def _strip_v(version: str) -> str:
+    """Drop a leading 'v'/'V' without allocating when there is none."""
+    return version[1:] if version[:1] in ('v', 'V') else version
+
+
+@lru_cache(maxsize=2048)
+def _parse_packaging(version: str):
+    """Parse with packaging.version, or None if unparseable (cached)."""
+    try:
+        return _Version(_strip_v(version))
+    except _InvalidVersion:
+        return None
+
+
+@lru_cache(maxsize=2048)
+def _normalize_tuple(version: str) -> Tuple[int, ...]:
+    """Parse a version string into a comparable tuple of integers.
+
+    Cached: an update cycle compares the same handful of installed
+    versions over and over, so repeat calls skip the regex and int()
+    work entirely. Tuples (unlike lists) are safe to share from a cache.
+    """
+    if not version:
+        return (0,)
+
+    # Strip common prefixes; the check is ASCII so no .lower() copy is
+    # needed, and digitless strings ("unknown", "none") fall out as (0,)
+    # from the regex pass anyway
+    version = _strip_v(version.strip())
+
+    # Extract only numeric parts
+    parts = tuple(int(m.group()) for m in _VER_RE.finditer(version))
+
+    return parts or (0,)
+
 
 def normalize_version(version: str) -> List[int]:
     """
     Normalize a version string to a list of integers for comparison.
-    
+
     Handles formats like:
     - 1.2.3
     - v1.2.3
     - 1.2.3-beta
     - 2024.1.3
     - 5.0.0-rc1
-    
+
     Args:
         version: The version string to normalize
-        
+
     Returns:
         List of integers representing version components
     """
-    if not version or version.lower() in ("unknown", "none", ""):
-        return [0]
-    
-    # Strip common prefixes
-    version = version.lower().strip()
-    if version.startswith("v"):
-        version = version[1:]
-    
-    # Extract only numeric parts
-    parts = re.findall(r'\d+', version)
-    
-    return [int(p) for p in parts] if parts else [0]
+    return list(_normalize_tuple(version))
 
 
 def compare_versions(v1: str, v2: str) -> int:
@@ -52,38 +91,39 @@ def compare_versions(v1: str, v2: str) -> int:
     Returns:
         1 if v1 > v2, -1 if v1 < v2, 0 if equal
     """
-    try:
-        # Try packaging library first (most accurate)
-        from packaging.version import Version, InvalidVersion
-        try:
-            ver1 = Version(v1.lstrip('v'))
-            ver2 = Version(v2.lstrip('v'))
+    # Fast path: repeated scans mostly compare a version to itself, and
+    # equal strings are always equal versions
+    if v1 == v2:
+        return 0
+
+    # Try packaging library first (most accurate)
+    if _Version is not None:
+        ver1 = _parse_packaging(v1)
+        ver2 = _parse_packaging(v2)
+        if ver1 is not None and ver2 is not None:
             if ver1 > ver2:
                 return 1
             elif ver1 < ver2:
                 return -1
             return 0
-        except InvalidVersion:
-            # Fall back to manual parsing
-            pass
-    except ImportError:
-        pass
-    
+        # Fall back to manual parsing
+
+
     # Fallback: Manual comparison
-    parts1 = normalize_version(v1)
-    parts2 = normalize_version(v2)
-    
-    # Pad shorter list with zeros
-    max_len = max(len(parts1), len(parts2))
-    parts1.extend([0] * (max_len - len(parts1)))
-    parts2.extend([0] * (max_len - len(parts2)))
-    
-    for a, b in zip(parts1, parts2):
-        if a > b:
-            return 1
-        elif a < b:
-            return -1
-    
+    parts1 = _normalize_tuple(v1)
+    parts2 = _normalize_tuple(v2)
+
+    # Pad the shorter tuple with zeros, then let CPython's C-level
+    # tuple comparison do the elementwise work
+    if len(parts1) != len(parts2):
+        max_len = max(len(parts1), len(parts2))
+        parts1 += (0,) * (max_len - len(parts1))
+        parts2 += (0,) * (max_len - len(parts2))
+
+    if parts1 > parts2:
+        return 1
+    if parts1 < parts2:
+        return -1
     return 0
 
 
@@ -98,6 +138,8 @@ def is_newer(new_version: str, current_version: str) -> bool:
     Returns:
         True if new_version > current_version
     """
+    if new_version == current_version:
+        return False
     return compare_versions(new_version, current_version) > 0
 
 
@@ -3,16 +3,73 @@ Universal Update Manager - Version Detector
 Per-app detection methods for installed software versions.
 """
 
+import asyncio
 import subprocess
 import re
 import json
 import logging
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, Callable
 from dataclasses import dataclass
 
 logger = logging.getLogger(__name__)
 
+# Compiled once: the detectors run these patterns per package/file, and
+# re.ASCII keeps \d from scanning the Unicode digit tables
+_VERSION_RE = re.compile(r"(\d+\.\d+(?:\.\d+)?)", re.ASCII)
+_VERSION3_RE = re.compile(r"(\d+\.\d+\.\d+)", re.ASCII)
+_EPOCH_RE = re.compile(r"^\d+:", re.ASCII)
+_ANKI_DIR_RE = re.compile(r"anki-?(\d+\.\d+(?:\.\d+)?)", re.I | re.ASCII)
+
+
+def _normalize_alias(name: str) -> str:
+    """Collapse a display name to a lookup key ("Brave Browser" etc.)."""
+    return name.lower().replace(" ", "").replace("-", "")
+
+
+def _extract_json_string_field(path: Path, field: str) -> Optional[str]:
+    """Pull one string field out of a small JSON file by byte scan.
+
+    Detectors like Discord's read a whole JSON document just to grab a
+    single version string; finding '"field": "value"' directly skips
+    the tokenizer and its dict allocation. Anything the scan can't
+    handle cleanly (escapes, non-string values, odd formatting) falls
+    back to json.loads.
+    """
+    try:
+        raw = path.read_bytes()
+    except OSError:
+        return None
+    idx = raw.find(b'"%s"' % field.encode())
+    if idx != -1:
+        rest = raw[idx + len(field) + 2:].lstrip()
+        if rest[:1] == b":":
+            rest = rest[1:].lstrip()
+            if rest[:1] == b'"':
+                end = rest.find(b'"', 1)
+                if end != -1 and b"\\" not in rest[1:end]:
+                    try:
+                        return rest[1:end].decode()
+                    except UnicodeDecodeError:
+                        pass
+    try:
+        value = json.loads(raw).get(field)
+    except Exception:
+        return None
+    return value if isinstance(value, str) else None
+
+
+@lru_cache(maxsize=None)
+def _have(tool: str) -> bool:
+    """Whether a tool exists on PATH - the answer can't change mid-run,
+    so one in-process PATH scan replaces a fork per probe."""
+    return shutil.which(tool) is not None
+
 
 @dataclass
 class VersionDetector:
@@ -46,6 +103,36 @@ class VersionDetector:
             "marktext": self._detect_marktext,
             "localsend": self._detect_localsend,
         }
+        # Normalized alias -> detector for O(1) dispatch before the
+        # substring fallback ("Brave Browser" -> "bravebrowser")
+        self._alias_map = {
+            _normalize_alias(pattern): detector
+            for pattern, detector in self._detectors.items()
+        }
+        # Detectors that have been converted to run on the event loop;
+        # the rest are delegated to the default executor by the async
+        # entry points
+        self._async_detectors = {
+            "brave": self._detect_brave_async,
+            "brave-browser": self._detect_brave_async,
+            "signal": self._detect_signal_async,
+            "vscode": self._detect_vscode_async,
+            "code": self._detect_vscode_async,
+            "obs-studio": self._detect_obs_async,
+            "obs": self._detect_obs_async,
+            "flameshot": self._detect_flameshot_async,
+        }
+        # Per-directory AppImage listings, invalidated by mtime: seven
+        # detectors share one scandir instead of re-globbing each
+        self._appimage_cache: dict[Path, tuple[float, list[str]]] = {}
+        # Detection results change at most on upgrade, so serve UI
+        # refreshes from a short TTL cache instead of re-forking probes
+        self._result_cache: dict[
+            tuple[str, Optional[str]], tuple[float, Optional[str]]
+        ] = {}
+        self._result_ttl = float(
+            os.environ.get("UUM_VERSION_CACHE_TTL", "60")
+        )
     
     def detect_version(self, app_id: str, app_name: str = None) -> Optional[str]:
         """
@@ -58,6 +145,29 @@ class VersionDetector:
         Returns:
             Version string or None if not detected
         """
+        key = (app_id.lower(), app_name)
+        now = time.monotonic()
+        hit = self._result_cache.get(key)
+        if hit is not None and now - hit[0] < self._result_ttl:
+            return hit[1]
+
+        version = self._detect_version_uncached(app_id, app_name)
+        self._result_cache[key] = (now, version)
+        return version
+
+    def invalidate(self, app_id: Optional[str] = None):
+        """Drop cached results for one app (or all) after an upgrade."""
+        if app_id is None:
+            self._result_cache.clear()
+            return
+        app_id = app_id.lower()
+        for key in [k for k in self._result_cache if k[0] == app_id]:
+            del self._result_cache[key]
+
+    def _detect_version_uncached(
+        self, app_id: str, app_name: str = None
+    ) -> Optional[str]:
+        """Run the actual detection chain for one app."""
         # Try exact ID match first
         app_id_lower = app_id.lower()
         if app_id_lower in self._detectors:
@@ -69,9 +179,19 @@ class VersionDetector:
             except Exception as e:
                 logger.warning(f"Version detection failed for {app_id}: {e}")
         
-        # Try name-based match
+        # Try name-based match - exact normalized alias first (O(1)),
+        # then the substring scan over every registered pattern
         if app_name:
             name_lower = app_name.lower()
+            detector = self._alias_map.get(_normalize_alias(app_name))
+            if detector is not None:
+                try:
+                    version = detector()
+                    if version:
+                        logger.debug(f"Detected {app_name}: {version}")
+                        return version
+                except Exception:
+                    pass
             for pattern, detector in self._detectors.items():
                 if pattern in name_lower or name_lower in pattern:
                     try:
@@ -104,6 +224,94 @@ class VersionDetector:
         
         return None
     
+    def detect_versions_batch(
+        self, items: list[tuple[str, Optional[str]]]
+    ) -> list[Optional[str]]:
+        """
+        Detect versions for several apps concurrently.
+
+        Each detection mostly waits on subprocesses, so a thread pool
+        turns N sequential ~5-50 ms probes into one round.
+
+        Args:
+            items: (app_id, app_name) tuples as taken by detect_version
+
+        Returns:
+            Detected versions (or None) in the same order as items
+        """
+        if len(items) <= 1:
+            return [self.detect_version(*item) for item in items]
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self._detect_all_async(items))
+        # Already inside a running event loop - fall back to threads
+        with ThreadPoolExecutor(max_workers=min(16, len(items))) as pool:
+            return list(
+                pool.map(lambda item: self.detect_version(*item), items)
+            )
+
+    async def _detect_all_async(
+        self, items: list[tuple[str, Optional[str]]]
+    ) -> list[Optional[str]]:
+        """Gather detect_version_async over all items on one loop."""
+        return list(await asyncio.gather(
+            *(self.detect_version_async(*item) for item in items)
+        ))
+
+    async def detect_version_async(
+        self, app_id: str, app_name: str = None
+    ) -> Optional[str]:
+        """Async counterpart of detect_version, sharing its cache.
+
+        Detectors converted to asyncio subprocesses run directly on the
+        event loop; the rest are handed to the default executor so the
+        fallback chain stays identical to the sync path.
+        """
+        key = (app_id.lower(), app_name)
+        now = time.monotonic()
+        hit = self._result_cache.get(key)
+        if hit is not None and now - hit[0] < self._result_ttl:
+            return hit[1]
+
+        version = await self._detect_version_uncached_async(app_id, app_name)
+        self._result_cache[key] = (now, version)
+        return version
+
+    async def _detect_version_uncached_async(
+        self, app_id: str, app_name: str = None
+    ) -> Optional[str]:
+        """Run the detection chain for one app without blocking the loop."""
+        detector = self._async_detectors.get(app_id.lower())
+        if detector is None and app_name:
+            detector = self._async_detectors.get(_normalize_alias(app_name))
+        if detector is not None:
+            try:
+                version = await detector()
+                if version:
+                    logger.debug(f"Detected {app_id}: {version}")
+                    return version
+            except Exception as e:
+                logger.warning(f"Version detection failed for {app_id}: {e}")
+            # Same tail as the sync chain, minus the detector scan the
+            # async variant already covered
+            version = await self._detect_via_dpkg_async(app_id)
+            if version:
+                return version
+            version = await self._detect_via_cli_async(app_id)
+            if version:
+                return version
+            try:
+                from core.version_store import get_stored_version
+                return get_stored_version(app_id)
+            except ImportError:
+                return None
+        # Unconverted detectors keep their blocking subprocess calls,
+        # so run the full sync chain off the loop
+        return await asyncio.to_thread(
+            self._detect_version_uncached, app_id, app_name
+        )
+
     def _run_cmd(self, cmd: list[str], timeout: int = 5) -> Optional[str]:
         """Run command and return stdout."""
         try:
@@ -118,33 +326,155 @@ class VersionDetector:
         except Exception:
             pass
         return None
-    
+
+    async def _run_cmd_async(
+        self, cmd: list[str], timeout: int = 5
+    ) -> Optional[str]:
+        """Async _run_cmd: the fork's I/O wait yields to the event loop."""
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+        except Exception:
+            return None
+        try:
+            stdout, _ = await asyncio.wait_for(proc.communicate(), timeout)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            return None
+        except Exception:
+            return None
+        if proc.returncode == 0:
+            return stdout.decode(errors="replace").strip()
+        return None
+
     def _detect_via_dpkg(self, package: str) -> Optional[str]:
         """Try to detect version via dpkg-query."""
         result = self._run_cmd(["dpkg-query", "-W", "-f=${Version}", package])
         if result:
             # Clean up version (remove epoch and revision)
-            return re.sub(r"^\d+:", "", result).split("-")[0].split("+")[0]
+            return _EPOCH_RE.sub("", result).split("-")[0].split("+")[0]
         return None
     
+    def _detect_via_dpkg_batch(self, packages: list[str]) -> dict[str, str]:
+        """Detect versions for many packages with one dpkg-query fork.
+
+        Unknown packages make dpkg-query exit non-zero, but the known
+        ones still print, so stdout is parsed regardless.
+        """
+        if not packages:
+            return {}
+        try:
+            result = subprocess.run(
+                ["dpkg-query", "-W",
+                 "-f=${Package}\t${Version}\t${Status}\n", *packages],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+                timeout=10,
+            )
+        except Exception:
+            return {}
+        versions = {}
+        for line in result.stdout.splitlines():
+            parts = line.split("\t")
+            if len(parts) >= 3 and "installed" in parts[2]:
+                versions[parts[0]] = (
+                    _EPOCH_RE.sub("", parts[1]).split("-")[0].split("+")[0]
+                )
+        return versions
+
     def _detect_via_cli(self, app: str) -> Optional[str]:
         """Try to detect version via --version flag."""
         result = self._run_cmd([app, "--version"])
         if result:
             # Extract version number
-            match = re.search(r"(\d+\.\d+(?:\.\d+)?)", result)
+            match = _VERSION_RE.search(result)
             if match:
                 return match.group(1)
         return None
-    
+
+    async def _detect_via_dpkg_async(self, package: str) -> Optional[str]:
+        """Async _detect_via_dpkg."""
+        result = await self._run_cmd_async(
+            ["dpkg-query", "-W", "-f=${Version}", package]
+        )
+        if result:
+            return _EPOCH_RE.sub("", result).split("-")[0].split("+")[0]
+        return None
+
+    async def _detect_via_cli_async(self, app: str) -> Optional[str]:
+        """Async _detect_via_cli."""
+        result = await self._run_cmd_async([app, "--version"])
+        if result:
+            match = _VERSION_RE.search(result)
+            if match:
+                return match.group(1)
+        return None
+
+
+    def _list_appimages(self, directory: Path) -> list[str]:
+        """List *.AppImage file names in a directory (mtime-cached)."""
+        try:
+            mtime = directory.stat().st_mtime
+        except OSError:
+            return []
+        cached = self._appimage_cache.get(directory)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        names = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.name.endswith("AppImage") and entry.is_file():
+                        names.append(entry.name)
+        except OSError:
+            names = []
+        self._appimage_cache[directory] = (mtime, names)
+        return names
+
+    def _find_appimage_version(
+        self, directories: list[Path], *fragments: str,
+        run_version: bool = False,
+    ) -> Optional[str]:
+        """First x.y.z in an AppImage name containing all fragments.
+
+        With run_version, matching AppImages whose names carry no
+        version are executed with --version as a last resort; that
+        costs a cold AppImage start (hundreds of ms), so it stays off
+        unless a detector opts in.
+        """
+        unversioned: list[Path] = []
+        for directory in directories:
+            for name in self._list_appimages(directory):
+                lower = name.lower()
+                if all(fragment in lower for fragment in fragments):
+                    match = _VERSION3_RE.search(name)
+                    if match:
+                        return match.group(1)
+                    if run_version:
+                        unversioned.append(directory / name)
+        for path in unversioned:
+            result = self._run_cmd([str(path), "--version"], timeout=10)
+            if result:
+                match = _VERSION3_RE.search(result)
+                if match:
+                    return match.group(1)
+        return None
+
     # ===== App-specific detectors =====
     
     def _detect_telegram(self) -> Optional[str]:
         """Detect Telegram Desktop version."""
         # Method 1: Check Flatpak (most common)
-        result = self._run_cmd(
-            ["flatpak", "info", "org.telegram.desktop"]
-        )
+        result = None
+        if _have("flatpak"):
+            result = self._run_cmd(
+                ["flatpak", "info", "org.telegram.desktop"]
+            )
         if result:
             for line in result.split("\n"):
                 if "Version:" in line:
@@ -168,7 +498,7 @@ class VersionDetector:
         """Detect Anki version."""
         # Method 1: Check prefs file in Anki2 folder
         prefs_path = Path.home() / ".local/share/Anki2/prefs21.db"
-        if prefs_path.exists():
+        if prefs_path.exists() and _have("sqlite3"):
             # prefs21.db is SQLite, try to read version
             result = self._run_cmd([
                 "sqlite3", str(prefs_path),
@@ -183,7 +513,7 @@ class VersionDetector:
             if version_file.exists():
                 return version_file.read_text().strip()
             # Try extracting from folder name
-            match = re.search(r"anki-?(\d+\.\d+(?:\.\d+)?)", str(anki_dir), re.I)
+            match = _ANKI_DIR_RE.search(str(anki_dir))
             if match:
                 return match.group(1)
         
@@ -195,7 +525,7 @@ class VersionDetector:
         # Method 1: CLI --version (works for both installed and AppImage via PATH)
         result = self._run_cmd(["xournalpp", "--version"])
         if result:
-            match = re.search(r"(\d+\.\d+\.\d+)", result)
+            match = _VERSION3_RE.search(result)
             if match:
                 return match.group(1)
         
@@ -204,25 +534,13 @@ class VersionDetector:
         if version:
             return version
         
-        # Method 3: AppImage with version in filename
-        for appimage_dir in [Path.home() / "Applications", Path.home() / "AppImages"]:
-            if appimage_dir.exists():
-                for f in appimage_dir.glob("*ournal*AppImage"):
-                    match = re.search(r"(\d+\.\d+\.\d+)", f.name)
-                    if match:
-                        return match.group(1)
-        
-        # Method 4: Try running AppImage directly with --version
-        for appimage_dir in [Path.home() / "Applications", Path.home() / "AppImages"]:
-            if appimage_dir.exists():
-                for f in appimage_dir.glob("*ournal*AppImage"):
-                    result = self._run_cmd([str(f), "--version"], timeout=10)
-                    if result:
-                        match = re.search(r"(\d+\.\d+\.\d+)", result)
-                        if match:
-                            return match.group(1)
-        
-        return None
+        # Method 3: AppImage - version in the filename, or (since the
+        # name carries none) a last-resort --version run
+        return self._find_appimage_version(
+            [Path.home() / "Applications", Path.home() / "AppImages"],
+            "ournal",
+            run_version=True,
+        )
     
 
     def _detect_brave(self) -> Optional[str]:
@@ -243,14 +561,10 @@ class VersionDetector:
             return version
         
         # Method 2: AppImage filename
-        for appimage_dir in [Path.home() / "Applications", Path.home() / "AppImages"]:
-            if appimage_dir.exists():
-                for f in appimage_dir.glob("*bsidian*AppImage"):
-                    match = re.search(r"(\d+\.\d+\.\d+)", f.name)
-                    if match:
-                        return match.group(1)
-        
-        return None
+        return self._find_appimage_version(
+            [Path.home() / "Applications", Path.home() / "AppImages"],
+            "bsidian",
+        )
     
     def _detect_signal(self) -> Optional[str]:
         """Detect Signal Desktop version."""
@@ -262,25 +576,19 @@ class VersionDetector:
         if version:
             return version
         # AppImage
-        for f in (Path.home() / "Applications").glob("*itwarden*AppImage"):
-            match = re.search(r"(\d+\.\d+\.\d+)", f.name)
-            if match:
-                return match.group(1)
-        return None
+        return self._find_appimage_version(
+            [Path.home() / "Applications"], "itwarden"
+        )
     
     def _detect_discord(self) -> Optional[str]:
         """Detect Discord version."""
         version = self._detect_via_dpkg("discord")
         if version:
             return version
-        # Check /opt
+        # Check /opt - build_info.json only matters for its one field
         discord_path = Path("/opt/Discord/resources/build_info.json")
         if discord_path.exists():
-            try:
-                data = json.loads(discord_path.read_text())
-                return data.get("version")
-            except:
-                pass
+            return _extract_json_string_field(discord_path, "version")
         return None
     
     def _detect_lutris(self) -> Optional[str]:
@@ -314,22 +622,16 @@ class VersionDetector:
     def _detect_joplin(self) -> Optional[str]:
         """Detect Joplin version."""
         # AppImage
-        for appimage_dir in [Path.home() / "Applications", Path.home() / ".joplin"]:
-            if appimage_dir.exists():
-                for f in appimage_dir.glob("*oplin*AppImage"):
-                    match = re.search(r"(\d+\.\d+\.\d+)", f.name)
-                    if match:
-                        return match.group(1)
-        return None
+        return self._find_appimage_version(
+            [Path.home() / "Applications", Path.home() / ".joplin"], "oplin"
+        )
     
     def _detect_logseq(self) -> Optional[str]:
         """Detect Logseq version."""
         # AppImage
-        for f in (Path.home() / "Applications").glob("*ogseq*AppImage"):
-            match = re.search(r"(\d+\.\d+\.\d+)", f.name)
-            if match:
-                return match.group(1)
-        return None
+        return self._find_appimage_version(
+            [Path.home() / "Applications"], "ogseq"
+        )
     
     def _detect_marktext(self) -> Optional[str]:
         """Detect Mark Text version."""
@@ -337,11 +639,9 @@ class VersionDetector:
         if version:
             return version
         # AppImage
-        for f in (Path.home() / "Applications").glob("*ark*ext*AppImage"):
-            match = re.search(r"(\d+\.\d+\.\d+)", f.name)
-            if match:
-                return match.group(1)
-        return None
+        return self._find_appimage_version(
+            [Path.home() / "Applications"], "ark", "ext"
+        )
     
     def _detect_localsend(self) -> Optional[str]:
         """Detect LocalSend version."""
@@ -349,11 +649,45 @@ class VersionDetector:
         if version:
             return version
         # AppImage
-        for f in (Path.home() / "Applications").glob("*ocal*end*AppImage"):
-            match = re.search(r"(\d+\.\d+\.\d+)", f.name)
-            if match:
-                return match.group(1)
-        return None
+        return self._find_appimage_version(
+            [Path.home() / "Applications"], "ocal", "end"
+        )
+
+    # ===== Async variants of the hottest detectors =====
+    # These are the detectors that reduce to dpkg/--version probes, so
+    # their subprocess waits can run on the event loop directly
+
+    async def _detect_brave_async(self) -> Optional[str]:
+        """Async _detect_brave."""
+        version = await self._detect_via_dpkg_async("brave-browser")
+        if version:
+            return version
+        return await self._detect_via_cli_async("brave-browser")
+
+    async def _detect_signal_async(self) -> Optional[str]:
+        """Async _detect_signal."""
+        return await self._detect_via_dpkg_async("signal-desktop")
+
+    async def _detect_vscode_async(self) -> Optional[str]:
+        """Async _detect_vscode."""
+        version = await self._detect_via_dpkg_async("code")
+        if version:
+            return version
+        return await self._detect_via_cli_async("code")
+
+    async def _detect_obs_async(self) -> Optional[str]:
+        """Async _detect_obs."""
+        version = await self._detect_via_dpkg_async("obs-studio")
+        if version:
+            return version
+        return await self._detect_via_cli_async("obs")
+
+    async def _detect_flameshot_async(self) -> Optional[str]:
+        """Async _detect_flameshot."""
+        version = await self._detect_via_dpkg_async("flameshot")
+        if version:
+            return version
+        return await self._detect_via_cli_async("flameshot")
 
 
 # Singleton instance
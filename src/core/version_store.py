@@ -3,8 +3,11 @@ Universal Update Manager - Persistent Version Storage
 Stores installed versions for apps that can't be auto-detected.
 """
 
+import atexit
 import json
 import logging
+import os
+import threading
 from pathlib import Path
 from typing import Optional
 from datetime import datetime
@@ -28,16 +31,26 @@ class VersionStore:
     2. User manually sets the version via UI
     """
     
+    # How long writes coalesce before hitting disk: a 30-app batch
+    # install becomes one rewrite instead of thirty
+    FLUSH_DELAY = 0.5
+
     def __init__(self):
         self._store_path = VERSION_STORE_PATH
         self._cache: dict = {}
         self._load()
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._flush_timer: Optional[threading.Timer] = None
+        atexit.register(self._flush_now)
     
     def _load(self):
         """Load stored versions from disk."""
         if self._store_path.exists():
             try:
-                self._cache = json.loads(self._store_path.read_text())
+                # read_bytes + json.loads: the parser handles the UTF-8
+                # itself, skipping the separate str decode copy
+                self._cache = json.loads(self._store_path.read_bytes())
             except (json.JSONDecodeError, IOError) as e:
                 logger.warning(f"Failed to load version store: {e}")
                 self._cache = {}
@@ -45,10 +58,32 @@ class VersionStore:
             self._cache = {}
     
     def _save(self):
-        """Save versions to disk."""
+        """Mark the store dirty and schedule a coalesced flush."""
+        with self._lock:
+            self._dirty = True
+            if self._flush_timer is None:
+                self._flush_timer = threading.Timer(
+                    self.FLUSH_DELAY, self._flush_now
+                )
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+
+    def _flush_now(self):
+        """Write pending changes to disk atomically."""
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._dirty:
+                return
+            payload = json.dumps(self._cache, indent=2).encode()
+            self._dirty = False
         try:
             self._store_path.parent.mkdir(parents=True, exist_ok=True)
-            self._store_path.write_text(json.dumps(self._cache, indent=2))
+            # Atomic rename: a crash mid-write can't truncate the store
+            tmp = self._store_path.with_suffix(".json.tmp")
+            tmp.write_bytes(payload)
+            os.replace(tmp, self._store_path)
         except IOError as e:
             logger.error(f"Failed to save version store: {e}")
     
@@ -84,6 +119,12 @@ class VersionStore:
         }
         self._save()
         logger.info(f"Stored version for {app_id}: {version}")
+        # A newly stored version supersedes any cached detection result
+        try:
+            from core.version_detector import get_detector
+            get_detector().invalidate(app_id)
+        except ImportError:
+            pass
     
     def remove_version(self, app_id: str):
         """Remove stored version for an app."""
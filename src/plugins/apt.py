@@ -5,6 +5,8 @@ Handles updates for native Debian/Ubuntu packages via APT.
 
 import subprocess
 import re
+import shutil
+from functools import lru_cache
 from typing import Optional
 import logging
 
@@ -19,6 +21,28 @@ from .base import (
 
 logger = logging.getLogger(__name__)
 
+# Format: package/release version [upgradable from: old_version]
+# Compiled once - this runs per line of `apt list --upgradable` output
+_APT_UPGRADABLE_RE = re.compile(
+    r"^(\S+)/\S+\s+(\S+)\s+.*\[upgradable from: (\S+)\]", re.ASCII
+)
+
+
+# Shared environment for every apt/dpkg invocation: built once, and
+# LC_ALL=C keeps the output ASCII so a cheap decode suffices
+_APT_ENV = {
+    "DEBIAN_FRONTEND": "noninteractive",
+    "LC_ALL": "C",
+    "PATH": "/usr/sbin:/usr/bin:/sbin:/bin",
+}
+
+
+@lru_cache(maxsize=None)
+def _apt_available() -> bool:
+    """Whether apt exists on PATH - cached, the answer can't change
+    mid-run and `which` cost a fork per refresh."""
+    return shutil.which("apt") is not None
+
 
 class APTPlugin(UpdateSourcePlugin):
     """Plugin for handling native APT package updates."""
@@ -52,18 +76,19 @@ class APTPlugin(UpdateSourcePlugin):
         """Run an apt command and return stdout."""
         cmd = ["pkexec", "apt"] if use_sudo else ["apt"]
         try:
+            # Bytes out, one decode over the whole output: skips the
+            # locale-aware text layer on the per-package hot path
             result = subprocess.run(
                 cmd + list(args),
                 capture_output=True,
-                text=True,
                 timeout=timeout,
-                env={"DEBIAN_FRONTEND": "noninteractive", "LC_ALL": "C"},
+                env=_APT_ENV,
             )
             if result.returncode == 0:
-                return result.stdout
+                return result.stdout.decode("ascii", "replace")
             else:
-                self._last_error = result.stderr
-                logger.debug(f"apt {args[0]} stderr: {result.stderr}")
+                self._last_error = result.stderr.decode("ascii", "replace")
+                logger.debug(f"apt {args[0]} stderr: {self._last_error}")
         except FileNotFoundError:
             logger.info("APT not available on this system")
         except subprocess.TimeoutExpired as e:
@@ -73,15 +98,7 @@ class APTPlugin(UpdateSourcePlugin):
 
     def _is_apt_available(self) -> bool:
         """Check if apt is available on the system."""
-        try:
-            result = subprocess.run(
-                ["which", "apt"],
-                capture_output=True,
-                timeout=5,
-            )
-            return result.returncode == 0
-        except:
-            return False
+        return _apt_available()
 
     def _get_upgradable_packages(self) -> dict[str, tuple[str, str]]:
         """
@@ -94,51 +111,87 @@ class APTPlugin(UpdateSourcePlugin):
         
         upgradable = {}
         if output:
-            # Format: package/release version [upgradable from: old_version]
-            pattern = r"^(\S+)/\S+\s+(\S+)\s+.*\[upgradable from: (\S+)\]"
-            for line in output.strip().split("\n"):
-                match = re.match(pattern, line)
-                if match:
-                    pkg_name = match.group(1)
-                    new_version = match.group(2)
-                    old_version = match.group(3)
-                    upgradable[pkg_name] = (old_version, new_version)
+            # Split-based parser: APT's columns are structurally trivial
+            # ("pkg/release version arch [upgradable from: old]"), so a
+            # few partitions beat running the regex engine per line
+            for line in output.splitlines():
+                head, sep, tail = line.partition(" [upgradable from: ")
+                if not sep:
+                    continue
+                pkg_slash_rel, _, rest = head.partition(" ")
+                pkg_name, slash, _ = pkg_slash_rel.partition("/")
+                new_version = rest.split(" ", 1)[0]
+                old_version = tail.rstrip("]").strip()
+                if not (slash and pkg_name and new_version and old_version):
+                    # Unexpected shape - let the old regex decide
+                    match = _APT_UPGRADABLE_RE.match(line)
+                    if not match:
+                        continue
+                    pkg_name, new_version, old_version = match.groups()
+                upgradable[pkg_name] = (old_version, new_version)
         
         self._upgradable_cache = upgradable
         return upgradable
 
-    def _get_package_info(self, package_name: str) -> Optional[dict]:
-        """Get info about an installed package."""
+    def _get_package_info_batch(self, package_names: list[str]) -> dict[str, dict]:
+        """
+        Get info about many installed packages with one dpkg-query fork.
+
+        Unknown packages make dpkg-query exit non-zero, but the known
+        ones still print, so stdout is parsed regardless.
+
+        Returns:
+            Dict mapping package name to its info dict; packages that
+            are missing or not installed are absent.
+        """
+        if not package_names:
+            return {}
         try:
             result = subprocess.run(
-                ["dpkg-query", "-W", "-f=${Version}\t${Status}\t${binary:Summary}", package_name],
-                capture_output=True,
+                ["dpkg-query", "-W",
+                 "-f=${Package}\t${Version}\t${Status}\t${binary:Summary}\n",
+                 *package_names],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
                 text=True,
-                timeout=5,
+                timeout=10,
             )
-            if result.returncode == 0:
-                parts = result.stdout.strip().split("\t")
-                if len(parts) >= 2 and "installed" in parts[1].lower():
-                    return {
-                        "version": parts[0],
-                        "status": parts[1],
-                        "description": parts[2] if len(parts) > 2 else "",
-                    }
         except Exception as e:
-            logger.debug(f"Failed to get info for {package_name}: {e}")
-        return None
+            logger.debug(f"Failed to query {len(package_names)} packages: {e}")
+            return {}
+
+        infos = {}
+        for line in result.stdout.splitlines():
+            parts = line.split("\t", 3)
+            if len(parts) >= 3 and "installed" in parts[2].lower():
+                infos[parts[0]] = {
+                    "version": parts[1],
+                    "status": parts[2],
+                    "description": parts[3] if len(parts) > 3 else "",
+                }
+        return infos
+
+    def _get_package_info(self, package_name: str) -> Optional[dict]:
+        """Get info about an installed package."""
+        return self._get_package_info_batch([package_name]).get(package_name)
 
     def get_tracked_software(self) -> list[SoftwareInfo]:
         """Get list of upgradable APT packages."""
         if not self._is_apt_available():
             return []
         
-        # If specific packages configured, track those
+        # If specific packages configured, track those - all resolved by
+        # one multi-package dpkg-query fork instead of one per package
         if self.packages:
+            pkg_ids = [
+                pkg if isinstance(pkg, str) else pkg.get("id", "")
+                for pkg in self.packages
+            ]
+            infos = self._get_package_info_batch(pkg_ids)
+
             result = []
-            for pkg in self.packages:
-                pkg_id = pkg if isinstance(pkg, str) else pkg.get("id", "")
-                info = self._get_package_info(pkg_id)
+            for pkg_id in pkg_ids:
+                info = infos.get(pkg_id)
                 if info:
                     result.append(SoftwareInfo(
                         id=pkg_id,
@@ -200,6 +253,7 @@ class APTPlugin(UpdateSourcePlugin):
                 capture_output=True,
                 text=True,
                 timeout=120,
+                env=_APT_ENV,
             )
             if result.returncode == 0:
                 # Clear cache so next check gets fresh data
@@ -227,14 +281,22 @@ class APTPlugin(UpdateSourcePlugin):
                 capture_output=True,
                 text=True,
                 timeout=300,
-                env={"DEBIAN_FRONTEND": "noninteractive", "LC_ALL": "C"},
+                env=_APT_ENV,
             )
             
             if result.returncode == 0:
                 # Get new version
                 info = self._get_package_info(software.id)
                 new_version = info["version"] if info else software.latest_version
-                
+
+                # The installed version changed - cached detections for
+                # this app are stale now
+                try:
+                    from core.version_detector import get_detector
+                    get_detector().invalidate(software.id)
+                except ImportError:
+                    pass
+
                 return InstallResult(
                     success=True,
                     new_version=new_version,
@@ -268,7 +330,7 @@ class APTPlugin(UpdateSourcePlugin):
                 capture_output=True,
                 text=True,
                 timeout=600,
-                env={"DEBIAN_FRONTEND": "noninteractive", "LC_ALL": "C"},
+                env=_APT_ENV,
             )
             
             if result.returncode == 0:
@@ -297,7 +359,7 @@ class APTPlugin(UpdateSourcePlugin):
                 capture_output=True,
                 text=True,
                 timeout=120,
-                env={"DEBIAN_FRONTEND": "noninteractive", "LC_ALL": "C"},
+                env=_APT_ENV,
             )
             
             if result.returncode == 0:
@@ -12,6 +12,11 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Shared User-Agent for every HTTP request the plugins make. urllib routes
+# all urlopen() calls through one module-global opener, so identifying
+# ourselves consistently is the one "session-wide" setting we control.
+USER_AGENT = "UniversalUpdateManager/1.0"
+
 
 class UpdateStatus(Enum):
     """Status of an update check."""
@@ -94,6 +99,11 @@ class UpdateSourcePlugin(ABC):
         """Short identifier for the source type (e.g., 'github')."""
         pass
 
+    # How many check_for_updates calls may run concurrently for this plugin.
+    # Defaults to 1 because most plugins populate a shared cache on first
+    # check; plugins whose checks are independent per package can raise it.
+    max_concurrent_checks: int = 1
+
     @property
     def icon(self) -> str:
         """Icon name or path for the plugin."""
@@ -5,6 +5,7 @@ Handles updates for Flatpak applications.
 
 import subprocess
 import re
+import time
 from typing import Optional
 import logging
 
@@ -23,14 +24,20 @@ logger = logging.getLogger(__name__)
 class FlatpakPlugin(UpdateSourcePlugin):
     """Plugin for handling Flatpak application updates."""
 
+    # How long one `flatpak remote-ls --updates` result stays valid. One
+    # check cycle over N apps should hit the remote once, not N times.
+    UPDATES_CACHE_TTL = 60
+
     def __init__(self, config: dict = None):
         """
         Initialize the Flatpak plugin.
-        
+
         Args:
             config: Optional configuration dict (currently unused).
         """
         self.config = config or {}
+        self._updates_cache: Optional[dict[str, str]] = None
+        self._updates_cache_time = 0.0
 
     @property
     def name(self) -> str:
@@ -61,13 +68,15 @@ class FlatpakPlugin(UpdateSourcePlugin):
 
     def _get_installed_apps(self) -> list[dict]:
         """Get list of installed Flatpak applications."""
+        # description is included here so get_tracked_software doesn't need
+        # a separate `flatpak info` fork per app
         output = self._run_flatpak(
-            "list", "--app", "--columns=application,version,name"
+            "list", "--app", "--columns=application,version,name,description"
         )
-        
+
         if not output:
             return []
-        
+
         apps = []
         for line in output.strip().split("\n"):
             if not line:
@@ -78,17 +87,23 @@ class FlatpakPlugin(UpdateSourcePlugin):
                     "id": parts[0],
                     "version": parts[1] if len(parts) > 1 else "",
                     "name": parts[2] if len(parts) > 2 else parts[0].split(".")[-1],
+                    "description": parts[3] if len(parts) > 3 else None,
                 })
-        
+
         return apps
 
     def _check_updates_available(self) -> dict[str, str]:
-        """Check which flatpaks have updates available."""
+        """Check which flatpaks have updates available (cached briefly)."""
+        now = time.monotonic()
+        if (self._updates_cache is not None
+                and now - self._updates_cache_time < self.UPDATES_CACHE_TTL):
+            return self._updates_cache
+
         output = self._run_flatpak(
             "remote-ls", "--updates", "--columns=application,version",
             timeout=15  # Reduced from 60s to prevent UI freeze
         )
-        
+
         updates = {}
         if output:
             for line in output.strip().split("\n"):
@@ -97,7 +112,9 @@ class FlatpakPlugin(UpdateSourcePlugin):
                 parts = line.split("\t")
                 if len(parts) >= 2:
                     updates[parts[0]] = parts[1]
-        
+
+        self._updates_cache = updates
+        self._updates_cache_time = now
         return updates
 
     def _get_app_description(self, app_id: str) -> Optional[str]:
@@ -115,9 +132,10 @@ class FlatpakPlugin(UpdateSourcePlugin):
         software_list = []
         
         for app in apps:
-            # Get description (may be slow, so we cache it)
-            description = self._get_app_description(app["id"])
-            
+            # Description comes from the batched `flatpak list` call; fall
+            # back to `flatpak info` only if the column was missing
+            description = app.get("description") or self._get_app_description(app["id"])
+
             software_list.append(SoftwareInfo(
                 id=app["id"],
                 name=app["name"],
@@ -189,11 +207,13 @@ class FlatpakPlugin(UpdateSourcePlugin):
             )
             
             if result.returncode == 0:
+                self._updates_cache = None  # State changed - force re-check
+
                 # Get new version
                 apps = self._get_installed_apps()
                 app = next((a for a in apps if a["id"] == software.id), None)
                 new_version = app["version"] if app else software.latest_version
-                
+
                 return InstallResult(success=True, new_version=new_version)
             else:
                 return InstallResult(
@@ -228,6 +248,7 @@ class FlatpakPlugin(UpdateSourcePlugin):
             )
             
             if result.returncode == 0:
+                self._updates_cache = None  # State changed - force re-check
                 return [InstallResult(success=True, new_version="latest")]
             else:
                 return [InstallResult(
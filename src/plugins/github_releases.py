@@ -7,6 +7,7 @@ import json
 import re
 import subprocess
 import tempfile
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 import logging
@@ -14,6 +15,7 @@ import urllib.request
 import urllib.error
 
 from .base import (
+    USER_AGENT,
     UpdateSourcePlugin,
     SoftwareInfo,
     UpdateStatus,
@@ -23,12 +25,27 @@ from .base import (
 
 logger = logging.getLogger(__name__)
 
+_GITHUB_URL_RE = re.compile(r"github\.com/([^/]+/[^/]+)")
+
+
+@lru_cache(maxsize=256)
+def _clean_repo(repo: str) -> str:
+    """Normalize a repo reference (possibly a full URL) to "owner/name"."""
+    if "github.com/" not in repo:
+        return repo
+    match = _GITHUB_URL_RE.search(repo)
+    return match.group(1).rstrip("/") if match else repo
+
 
 class GitHubReleasesPlugin(UpdateSourcePlugin):
     """Plugin for handling GitHub Releases as update source."""
 
     GITHUB_API = "https://api.github.com/repos/{owner}/{repo}/releases/latest"
 
+    # Checks hit one endpoint per repo and share no cache; allow a few in
+    # flight but stay polite with the GitHub API rate limits
+    max_concurrent_checks = 6
+
     def __init__(self, config: dict):
         """
         Initialize the GitHub Releases plugin.
@@ -44,6 +61,13 @@ class GitHubReleasesPlugin(UpdateSourcePlugin):
         self.packages = config.get("packages", [])
         self._last_error: str = ""  # Track last API error for UI feedback
 
+        # Build API headers once - identical for every request this plugin makes
+        self._api_headers = {"User-Agent": USER_AGENT}
+        token = config.get("token")
+        if token:
+            # Use stored token if available to avoid rate limits
+            self._api_headers["Authorization"] = f"Bearer {token}"
+
     @property
     def name(self) -> str:
         return "GitHub Releases"
@@ -73,13 +97,7 @@ class GitHubReleasesPlugin(UpdateSourcePlugin):
 
     def _fetch_latest_release(self, repo: str) -> Optional[dict]:
         """Fetch the latest release info from GitHub API."""
-        # Sanitize repo string if it contains full URL
-        if "github.com/" in repo:
-            import re
-            match = re.search(r"github\.com/([^/]+/[^/]+)", repo)
-            if match:
-                repo = match.group(1).rstrip("/")
-
+        repo = _clean_repo(repo)
         owner_repo = repo.split("/")
         if len(owner_repo) < 2:
             logger.error(f"Invalid repo format: {repo}")
@@ -87,13 +105,7 @@ class GitHubReleasesPlugin(UpdateSourcePlugin):
             
         url = self.GITHUB_API.format(owner=owner_repo[0], repo=owner_repo[1])
         try:
-            # Use stored token if available to avoid rate limits
-            headers = {"User-Agent": "UniversalUpdateManager/1.0"}
-            token = self.config.get("token")
-            if token:
-                headers["Authorization"] = f"Bearer {token}"
-            
-            req = urllib.request.Request(url, headers=headers)
+            req = urllib.request.Request(url, headers=self._api_headers)
             with urllib.request.urlopen(req, timeout=10) as response:
                 # Log rate limit info
                 remaining = response.headers.get("X-RateLimit-Remaining", "?")
@@ -128,13 +140,7 @@ class GitHubReleasesPlugin(UpdateSourcePlugin):
 
     def _fetch_releases_list(self, repo: str, max_releases: int = 10) -> list[dict]:
         """Fetch a list of releases from GitHub API (for apps that publish assets on non-latest releases)."""
-        # Sanitize repo string if it contains full URL
-        if "github.com/" in repo:
-            import re
-            match = re.search(r"github\.com/([^/]+/[^/]+)", repo)
-            if match:
-                repo = match.group(1).rstrip("/")
-
+        repo = _clean_repo(repo)
         owner_repo = repo.split("/")
         if len(owner_repo) < 2:
             logger.error(f"Invalid repo format: {repo}")
@@ -142,12 +148,7 @@ class GitHubReleasesPlugin(UpdateSourcePlugin):
             
         url = f"https://api.github.com/repos/{owner_repo[0]}/{owner_repo[1]}/releases?per_page={max_releases}"
         try:
-            headers = {"User-Agent": "UniversalUpdateManager/1.0"}
-            token = self.config.get("token")
-            if token:
-                headers["Authorization"] = f"Bearer {token}"
-            
-            req = urllib.request.Request(url, headers=headers)
+            req = urllib.request.Request(url, headers=self._api_headers)
             with urllib.request.urlopen(req, timeout=15) as response:
                 remaining = response.headers.get("X-RateLimit-Remaining", "?")
                 logger.debug(f"GitHub API rate limit remaining: {remaining}")
@@ -186,12 +187,7 @@ class GitHubReleasesPlugin(UpdateSourcePlugin):
         """Fetch the repository description from GitHub API."""
         url = f"https://api.github.com/repos/{repo}"
         try:
-            headers = {"User-Agent": "UniversalUpdateManager/1.0"}
-            token = self.config.get("token")
-            if token:
-                headers["Authorization"] = f"Bearer {token}"
-                
-            req = urllib.request.Request(url, headers=headers)
+            req = urllib.request.Request(url, headers=self._api_headers)
             with urllib.request.urlopen(req, timeout=10) as response:
                 data = json.loads(response.read().decode())
                 return data.get("description", "")
@@ -230,13 +226,7 @@ class GitHubReleasesPlugin(UpdateSourcePlugin):
                 installed = "unknown"
             
             # Normalize repo URL to user/repo format
-            repo = pkg.get("repo", "")
-            if "github.com/" in repo:
-                # Extract user/repo from full URL
-                import re
-                match = re.search(r"github\.com/([^/]+/[^/]+)", repo)
-                if match:
-                    repo = match.group(1).rstrip("/")
+            repo = _clean_repo(pkg.get("repo", ""))
             pkg["repo"] = repo  # Update in place for later use
             
             # Get description from config or will be fetched later
@@ -337,7 +327,7 @@ class GitHubReleasesPlugin(UpdateSourcePlugin):
             
             req = urllib.request.Request(
                 download_url,
-                headers={"User-Agent": "UniversalUpdateManager/1.0"}
+                headers={"User-Agent": USER_AGENT}
             )
             with urllib.request.urlopen(req, timeout=120) as response:
                 with open(tmp_file, "wb") as f:
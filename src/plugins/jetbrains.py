@@ -11,6 +11,7 @@ import urllib.request
 import urllib.error
 
 from plugins.base import (
+    USER_AGENT,
     UpdateSourcePlugin,
     SoftwareInfo,
     UpdateStatus,
@@ -66,7 +67,7 @@ class JetBrainsPlugin(UpdateSourcePlugin):
         
         try:
             url = f"{self.API_URL}?code={product_code}&latest=true&type=release"
-            req = urllib.request.Request(url)
+            req = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
             
             with urllib.request.urlopen(req, timeout=15) as response:
                 data = json.loads(response.read().decode('utf-8'))
@@ -48,7 +48,10 @@ class SimpleHTMLTextExtractor(HTMLParser):
 
 class WebScraperPlugin(UpdateSourcePlugin):
     """Plugin for checking updates via web scraping."""
-    
+
+    # Each package scrapes a different site, so checks are independent
+    max_concurrent_checks = 4
+
     def __init__(self, config: dict = None):
         """
         Initialize the web scraper plugin.